@@ -0,0 +1,139 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.catalogos import obtener_catalogos, refrescar_catalogos
+from core.submetricas import SUBMETRICAS, Submetrica
+from models.estaciones import Estacion
+
+
+@dataclass(frozen=True)
+class SerieRegional:
+    """Estadísticos por periodo de una submétrica sobre todas las estaciones de una región"""
+    periodos: List[str]
+    media: List[float]
+    mediana: List[float]
+    minimo: List[float]
+    maximo: List[float]
+    estaciones: List[int]
+
+    def puntos(self) -> List[dict]:
+        return [
+            {"periodo": p, "media": me, "mediana": md, "minimo": mi, "maximo": ma, "estaciones": n}
+            for p, me, md, mi, ma, n in zip(
+                self.periodos, self.media, self.mediana, self.minimo, self.maximo, self.estaciones
+            )
+        ]
+
+
+class AgregadosRegionales:
+    """
+    Agregados región × submétrica × periodo precalculados.
+
+    Se construyen en cada refresco a partir de la relación estación → región de
+    v_estaciones y se reemplazan de forma atómica, como el índice de disponibilidad.
+    """
+
+    def __init__(self, series: Dict[Tuple[int, str], SerieRegional], regiones: Dict[int, Optional[str]],
+                 actualizado: datetime):
+        self._series = series
+        self.regiones = regiones
+        self.actualizado = actualizado
+
+    def serie(self, numero_region: int, submetrica: str) -> Optional[SerieRegional]:
+        return self._series.get((numero_region, submetrica))
+
+
+_SUBMETRICAS_POR_VISTA: Dict[type, List[Submetrica]] = {}
+for _sub in SUBMETRICAS.values():
+    _SUBMETRICAS_POR_VISTA.setdefault(_sub.modelo, []).append(_sub)
+
+_agregados: Optional[AgregadosRegionales] = None
+
+
+def obtener_agregados() -> Optional[AgregadosRegionales]:
+    """Agregados vigentes, o None si aún no se han podido construir"""
+    return _agregados
+
+
+def estadisticos_por_grupo(grupos: np.ndarray, valores: np.ndarray):
+    """
+    Reducción vectorizada por grupo: (grupos, conteo, media, mediana, mínimo, máximo).
+
+    Ordena por (grupo, valor) una sola vez; con cada grupo ordenado, el mínimo, el máximo
+    y la mediana son posiciones fijas dentro del tramo y la suma es un reduceat.
+    """
+    orden = np.lexsort((valores, grupos))
+    grupos, valores = grupos[orden], valores[orden]
+    inicios = np.flatnonzero(np.r_[True, grupos[1:] != grupos[:-1]])
+    conteos = np.diff(np.r_[inicios, len(grupos)])
+    finales = inicios + conteos - 1
+    media = np.add.reduceat(valores, inicios) / conteos
+    mediana = (valores[inicios + (conteos - 1) // 2] + valores[inicios + conteos // 2]) / 2
+    return grupos[inicios], conteos, media, mediana, valores[inicios], valores[finales]
+
+
+async def construir_agregados(db: AsyncSession) -> AgregadosRegionales:
+    """Una consulta por vista (unida a v_estaciones) y la agregación en memoria con numpy"""
+    catalogos = obtener_catalogos() or await refrescar_catalogos(db)
+    regiones = {region.numero_region: region.nombre_region for region in catalogos.regiones}
+
+    series: Dict[Tuple[int, str], SerieRegional] = {}
+    for modelo, subs in _SUBMETRICAS_POR_VISTA.items():
+        clave = subs[0].clave_periodo
+        filas = (await db.execute(
+            select(Estacion.numero_region, clave, subs[0].periodo, *[sub.valor for sub in subs])
+            .join(Estacion, Estacion.nombre == modelo.estacion)
+            .where(Estacion.numero_region.isnot(None))
+            .order_by(Estacion.numero_region, clave)
+        )).all()
+        if not filas:
+            continue
+
+        # Cada (región, periodo) se codifica como un entero creciente (las filas vienen
+        # ordenadas); las vistas tienen una fila por estación y periodo, así que el conteo
+        # de valores es el de estaciones
+        codigos: Dict[Tuple[int, int], int] = {}
+        etiquetas: List[Tuple[int, int, str]] = []
+        grupos = np.empty(len(filas), dtype=np.int64)
+        for i, fila in enumerate(filas):
+            region, clave_fila, periodo = fila[0], fila[1], fila[2]
+            codigo = codigos.get((region, clave_fila))
+            if codigo is None:
+                codigo = codigos[(region, clave_fila)] = len(etiquetas)
+                etiquetas.append((region, clave_fila, str(periodo)))
+            grupos[i] = codigo
+
+        for j, sub in enumerate(subs):
+            valores = np.array([fila[3 + j] for fila in filas], dtype=float)
+            con_valor = ~np.isnan(valores)
+            if not con_valor.any():
+                continue
+            codigos_grupo, conteos, media, mediana, minimo, maximo = estadisticos_por_grupo(
+                grupos[con_valor], valores[con_valor]
+            )
+            por_region: Dict[int, List[int]] = {}
+            for k, codigo in enumerate(codigos_grupo.tolist()):
+                por_region.setdefault(etiquetas[codigo][0], []).append(k)
+            for region, ks in por_region.items():
+                series[(region, sub.nombre)] = SerieRegional(
+                    periodos=[etiquetas[codigos_grupo[k]][2] for k in ks],
+                    media=media[ks].tolist(),
+                    mediana=mediana[ks].tolist(),
+                    minimo=minimo[ks].tolist(),
+                    maximo=maximo[ks].tolist(),
+                    estaciones=conteos[ks].tolist(),
+                )
+
+    return AgregadosRegionales(series, regiones, datetime.now())
+
+
+async def refrescar_agregados(db: AsyncSession) -> AgregadosRegionales:
+    """Reconstruye los agregados regionales y los publica para todos los handlers del proceso"""
+    global _agregados
+    _agregados = await construir_agregados(db)
+    return _agregados
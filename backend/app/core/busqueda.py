@@ -0,0 +1,185 @@
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.catalogos import obtener_catalogos, refrescar_catalogos
+from core.config import settings
+
+FUENTE_ESTACION = "estacion"
+FUENTE_ENTIDAD_AGUA = "entidad_agua"
+
+_NO_ALFANUMERICO = re.compile(r"[^0-9a-z]+")
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas, sin tildes ni signos: 'Ñuñoa (Sur)' -> 'nunoa sur'"""
+    descompuesto = unicodedata.normalize("NFKD", texto.casefold())
+    sin_tildes = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return _NO_ALFANUMERICO.sub(" ", sin_tildes).strip()
+
+
+def trigramas(normalizado: str) -> FrozenSet[str]:
+    """Trigramas de cada palabra con el mismo relleno que pg_trgm ('  pal', ' pa', ..., 'ra ')"""
+    return frozenset(
+        relleno[i:i + 3]
+        for palabra in normalizado.split()
+        for relleno in (f"  {palabra} ",)
+        for i in range(len(relleno) - 2)
+    )
+
+
+@dataclass(frozen=True)
+class Documento:
+    """Un nombre buscable: una estación o una entidad de agua (con todos sus tipos)"""
+    nombre: str
+    fuente: str
+    numero_region: Optional[int]
+    nombre_region: Optional[str]
+    tipos: Tuple[str, ...]
+    normalizado: str
+
+
+class _NodoTrie:
+    __slots__ = ("hijos", "documentos")
+
+    def __init__(self):
+        self.hijos: Dict[str, "_NodoTrie"] = {}
+        self.documentos: List[int] = []
+
+
+class IndiceBusqueda:
+    """
+    Índice de autocompletado sobre estaciones y entidades de agua.
+
+    Un trie de prefijos indexa el nombre normalizado desde el comienzo de cada palabra
+    ('san' encuentra 'Quinta Normal San Miguel'); cada nodo guarda los documentos bajo él,
+    así un prefijo se resuelve en O(largo del prefijo). Si los prefijos no alcanzan el
+    límite, se completa con similitud de trigramas para tolerar errores de tipeo.
+    Inmutable: cada refresco construye un índice nuevo.
+    """
+
+    def __init__(self, documentos: List[Documento], actualizado: datetime):
+        self.documentos = sorted(documentos, key=lambda d: (d.normalizado, d.fuente, d.nombre))
+        self.actualizado = actualizado
+        self._normalizados = [d.normalizado for d in self.documentos]
+        self._raiz = _NodoTrie()
+        self._trigramas: Dict[str, List[int]] = {}
+        self._cantidad_trigramas: List[int] = []
+
+        for i, documento in enumerate(self.documentos):
+            palabras = documento.normalizado.split()
+            visitados = set()
+            for inicio in range(len(palabras)):
+                nodo = self._raiz
+                for caracter in " ".join(palabras[inicio:]):
+                    nodo = nodo.hijos.setdefault(caracter, _NodoTrie())
+                    if id(nodo) not in visitados:
+                        visitados.add(id(nodo))
+                        nodo.documentos.append(i)
+
+            propios = trigramas(documento.normalizado)
+            self._cantidad_trigramas.append(len(propios))
+            for trigrama in propios:
+                self._trigramas.setdefault(trigrama, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.documentos)
+
+    def _por_prefijo(self, consulta: str) -> List[int]:
+        nodo = self._raiz
+        for caracter in consulta:
+            nodo = nodo.hijos.get(caracter)
+            if nodo is None:
+                return []
+        return nodo.documentos
+
+    def _similares(self, consulta: str) -> List[Tuple[int, float]]:
+        propios = trigramas(consulta)
+        if not propios:
+            return []
+        comunes = Counter(i for trigrama in propios for i in self._trigramas.get(trigrama, ()))
+        similares = []
+        for i, cantidad in comunes.items():
+            similitud = cantidad / (len(propios) + self._cantidad_trigramas[i] - cantidad)
+            if similitud >= settings.busqueda_similitud_minima:
+                similares.append((i, similitud))
+        return similares
+
+    def buscar(self, texto: str, limite: int, fuente: Optional[str] = None) -> List[Tuple[Documento, str, float]]:
+        """
+        Hasta limite documentos como (documento, coincidencia, puntaje).
+
+        Primero los que empiezan con el texto (nombre exacto, luego nombre completo, luego
+        una palabra interior), después los similares por trigramas de mayor a menor puntaje.
+        """
+        consulta = normalizar(texto)
+        if not consulta:
+            return []
+
+        def admitido(i: int) -> bool:
+            return fuente is None or self.documentos[i].fuente == fuente
+
+        # Los documentos están ordenados por nombre normalizado: los que empiezan con la
+        # consulta forman un tramo contiguo, y el nombre exacto (si existe) va primero
+        inicio = bisect_left(self._normalizados, consulta)
+        fin = bisect_left(self._normalizados, consulta + "~")
+        elegidos = list(islice((i for i in range(inicio, fin) if admitido(i)), limite))
+        if len(elegidos) < limite:
+            for i in self._por_prefijo(consulta):
+                if not inicio <= i < fin and admitido(i):
+                    elegidos.append(i)
+                    if len(elegidos) == limite:
+                        break
+        resultados = [(self.documentos[i], "prefijo", 1.0) for i in elegidos]
+        if len(resultados) >= limite:
+            return resultados
+
+        ya_incluidos = set(self._por_prefijo(consulta))
+        similares = sorted(
+            ((i, similitud) for i, similitud in self._similares(consulta)
+             if i not in ya_incluidos and admitido(i)),
+            key=lambda par: (-par[1], par[0])
+        )
+        resultados += [
+            (self.documentos[i], "similar", round(similitud, 3))
+            for i, similitud in similares[:limite - len(resultados)]
+        ]
+        return resultados
+
+
+_indice_busqueda: Optional[IndiceBusqueda] = None
+
+
+def obtener_indice_busqueda() -> Optional[IndiceBusqueda]:
+    """Índice de búsqueda vigente, o None si aún no se ha podido construir"""
+    return _indice_busqueda
+
+
+async def construir_indice_busqueda(db: AsyncSession) -> IndiceBusqueda:
+    """Construye el índice con los nombres de estaciones y entidades de agua del catálogo"""
+    catalogos = obtener_catalogos() or await refrescar_catalogos(db)
+    documentos = [
+        Documento(e.nombre, FUENTE_ESTACION, e.numero_region, e.nombre_region, (), normalizar(e.nombre))
+        for e in catalogos.estaciones
+    ]
+    nombres_entidades = dict.fromkeys(e.nombre for e in catalogos.entidades_agua if e.nombre)
+    documentos += [
+        Documento(nombre, FUENTE_ENTIDAD_AGUA, None, None, catalogos.tipos_entidad_nombre(nombre), normalizar(nombre))
+        for nombre in nombres_entidades
+    ]
+
+    return IndiceBusqueda([d for d in documentos if d.normalizado], datetime.now())
+
+
+async def refrescar_indice_busqueda(db: AsyncSession) -> IndiceBusqueda:
+    """Reconstruye el índice de búsqueda y lo publica para todos los handlers del proceso"""
+    global _indice_busqueda
+    _indice_busqueda = await construir_indice_busqueda(db)
+    return _indice_busqueda
@@ -0,0 +1,130 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from core.compresion import comprimir
+from core.config import settings
+
+
+@dataclass
+class EntradaCache:
+    """
+    Respuesta ya serializada, lista para reenviarse sin consultar ni serializar.
+
+    Guarda además las variantes comprimidas (gzip, br) a medida que los clientes las
+    piden, para que los aciertos siguientes no vuelvan a comprimir.
+    """
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    cuerpo: bytes
+    expira: float = 0.0
+    variantes: Dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def tamano(self) -> int:
+        return (
+            len(self.cuerpo)
+            + sum(len(cuerpo) for cuerpo in self.variantes.values())
+            + sum(len(k) + len(v) for k, v in self.headers)
+        )
+
+
+@dataclass
+class _Contadores:
+    aciertos: int = 0
+    fallos: int = 0
+    desalojos: int = 0
+    expiradas: int = 0
+    omitidas: int = 0
+
+
+class CacheRespuestas:
+    """
+    Cache LRU de respuestas con expiración y presupuesto de memoria.
+
+    Las entradas se ordenan por último uso; al superar el presupuesto se desalojan
+    las menos usadas. Una entrada más grande que el máximo por entrada no se guarda.
+    """
+
+    def __init__(self, ttl_segundos: int, memoria_maxima: int, entrada_maxima: int):
+        self.ttl_segundos = ttl_segundos
+        self.memoria_maxima = memoria_maxima
+        self.entrada_maxima = entrada_maxima
+        self._entradas: "OrderedDict[str, EntradaCache]" = OrderedDict()
+        self._bytes = 0
+        self._contadores = _Contadores()
+
+    def obtener(self, clave: str) -> Optional[EntradaCache]:
+        entrada = self._entradas.get(clave)
+        if entrada is None:
+            self._contadores.fallos += 1
+            return None
+        if entrada.expira <= time.monotonic():
+            self._quitar(clave)
+            self._contadores.expiradas += 1
+            self._contadores.fallos += 1
+            return None
+        self._entradas.move_to_end(clave)
+        self._contadores.aciertos += 1
+        return entrada
+
+    def guardar(self, clave: str, entrada: EntradaCache):
+        tamano = entrada.tamano
+        if tamano > min(self.entrada_maxima, self.memoria_maxima):
+            self._contadores.omitidas += 1
+            return
+        if clave in self._entradas:
+            self._quitar(clave)
+        while self._bytes + tamano > self.memoria_maxima:
+            self._quitar(next(iter(self._entradas)))
+            self._contadores.desalojos += 1
+        entrada.expira = time.monotonic() + self.ttl_segundos
+        self._entradas[clave] = entrada
+        self._bytes += tamano
+
+    def variante(self, clave: str, entrada: EntradaCache, codificacion: str) -> bytes:
+        """Cuerpo comprimido de la entrada; se comprime solo la primera vez que se pide"""
+        cuerpo = entrada.variantes.get(codificacion)
+        if cuerpo is not None:
+            return cuerpo
+        cuerpo = comprimir(entrada.cuerpo, codificacion)
+        entrada.variantes[codificacion] = cuerpo
+        if self._entradas.get(clave) is entrada:
+            self._bytes += len(cuerpo)
+            # La entrada recién usada queda al final y no se desaloja a sí misma
+            while self._bytes > self.memoria_maxima and len(self._entradas) > 1:
+                self._quitar(next(iter(self._entradas)))
+                self._contadores.desalojos += 1
+        return cuerpo
+
+    def vaciar(self):
+        self._entradas.clear()
+        self._bytes = 0
+
+    def estadisticas(self) -> dict:
+        consultas = self._contadores.aciertos + self._contadores.fallos
+        return {
+            "entradas": len(self._entradas),
+            "bytes": self._bytes,
+            "memoria_maxima": self.memoria_maxima,
+            "ttl_segundos": self.ttl_segundos,
+            "aciertos": self._contadores.aciertos,
+            "fallos": self._contadores.fallos,
+            "tasa_aciertos": self._contadores.aciertos / consultas if consultas else 0.0,
+            "desalojos": self._contadores.desalojos,
+            "expiradas": self._contadores.expiradas,
+            "omitidas": self._contadores.omitidas,
+        }
+
+    def _quitar(self, clave: str):
+        entrada = self._entradas.pop(clave)
+        self._bytes -= entrada.tamano
+
+
+# Cache compartido por el proceso (cada worker de gunicorn tiene el suyo)
+cache_respuestas = CacheRespuestas(
+    ttl_segundos=settings.cache_ttl_segundos,
+    memoria_maxima=settings.cache_memoria_maxima_mb * 1024 * 1024,
+    entrada_maxima=settings.cache_entrada_maxima_mb * 1024 * 1024,
+)
@@ -0,0 +1,129 @@
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.entidades_agua import EntidadAgua
+from models.estaciones import Estacion
+
+
+@dataclass(frozen=True)
+class EstacionCatalogo:
+    nombre: str
+    latitud: Optional[float]
+    longitud: Optional[float]
+    numero_region: Optional[int]
+    nombre_region: Optional[str]
+    descripcion: Optional[str]
+
+
+@dataclass(frozen=True)
+class RegionCatalogo:
+    numero_region: int
+    nombre_region: Optional[str]
+
+
+@dataclass(frozen=True)
+class EntidadAguaCatalogo:
+    id: int
+    nombre: Optional[str]
+    tipo: Optional[str]
+    descripcion: Optional[str]
+
+
+class Catalogos:
+    """
+    Estaciones, regiones, entidades de agua y sus tipos, cargados en memoria.
+
+    Los handlers validan nombres y listan catálogos sin ir a la base de datos. Todo es
+    de solo lectura (tuplas y MappingProxyType) y cada refresco publica una instancia
+    nueva, igual que los índices de disponibilidad y espacial.
+    """
+
+    def __init__(self, estaciones: List[EstacionCatalogo], entidades: List[EntidadAguaCatalogo],
+                 actualizado: datetime):
+        self.actualizado = actualizado
+
+        self.estaciones: Tuple[EstacionCatalogo, ...] = tuple(sorted(estaciones, key=lambda e: e.nombre))
+        self._estaciones: Mapping[str, EstacionCatalogo] = MappingProxyType(
+            {estacion.nombre: estacion for estacion in self.estaciones}
+        )
+        regiones = {
+            estacion.numero_region: estacion.nombre_region
+            for estacion in self.estaciones if estacion.numero_region is not None
+        }
+        self.regiones: Tuple[RegionCatalogo, ...] = tuple(
+            RegionCatalogo(numero, nombre) for numero, nombre in sorted(regiones.items())
+        )
+
+        # Mismo orden que la consulta original: por tipo y luego por nombre
+        self.entidades_agua: Tuple[EntidadAguaCatalogo, ...] = tuple(
+            sorted(entidades, key=lambda e: (e.tipo or "", e.nombre or "", e.id))
+        )
+        por_tipo: Dict[str, List[EntidadAguaCatalogo]] = {}
+        tipos_por_nombre: Dict[str, set] = {}
+        for entidad in self.entidades_agua:
+            por_tipo.setdefault(entidad.tipo, []).append(entidad)
+            tipos_por_nombre.setdefault(entidad.nombre, set()).add(entidad.tipo)
+        self.tipos_entidad: Tuple[str, ...] = tuple(sorted(tipo for tipo in por_tipo if tipo is not None))
+        self._entidades_por_tipo: Mapping[str, Tuple[EntidadAguaCatalogo, ...]] = MappingProxyType({
+            tipo: tuple(sorted(entidades, key=lambda e: (e.nombre or "", e.id)))
+            for tipo, entidades in por_tipo.items()
+        })
+        self._tipos_por_nombre: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+            nombre: tuple(sorted(tipo for tipo in tipos if tipo is not None))
+            for nombre, tipos in tipos_por_nombre.items()
+        })
+
+    def estacion(self, nombre: str) -> Optional[EstacionCatalogo]:
+        return self._estaciones.get(nombre)
+
+    def estaciones_region(self, numero_region: Optional[int]) -> Tuple[EstacionCatalogo, ...]:
+        """Estaciones ordenadas por nombre, todas o solo las de una región"""
+        if numero_region is None:
+            return self.estaciones
+        return tuple(e for e in self.estaciones if e.numero_region == numero_region)
+
+    def nombre_region(self, numero_region: int) -> Optional[str]:
+        for region in self.regiones:
+            if region.numero_region == numero_region:
+                return region.nombre_region
+        return None
+
+    def entidades_tipo(self, tipo: str) -> Tuple[EntidadAguaCatalogo, ...]:
+        return self._entidades_por_tipo.get(tipo, ())
+
+    def tipos_entidad_nombre(self, nombre: str) -> Tuple[str, ...]:
+        """Tipos (métricas) de las entidades de agua con ese nombre"""
+        return self._tipos_por_nombre.get(nombre, ())
+
+
+_catalogos: Optional[Catalogos] = None
+
+
+def obtener_catalogos() -> Optional[Catalogos]:
+    """Catálogos vigentes, o None si aún no se han podido cargar"""
+    return _catalogos
+
+
+async def construir_catalogos(db: AsyncSession) -> Catalogos:
+    """Carga v_estaciones y v_entidades_agua completas (dos consultas)"""
+    estaciones = [
+        EstacionCatalogo(e.nombre, e.latitud, e.longitud, e.numero_region, e.nombre_region, e.descripcion)
+        for e in (await db.execute(select(Estacion))).scalars().all()
+    ]
+    entidades = [
+        EntidadAguaCatalogo(e.id, e.nombre, e.tipo, e.descripcion)
+        for e in (await db.execute(select(EntidadAgua))).scalars().all()
+    ]
+    return Catalogos(estaciones, entidades, datetime.now())
+
+
+async def refrescar_catalogos(db: AsyncSession) -> Catalogos:
+    """Recarga los catálogos y los publica para todos los handlers del proceso"""
+    global _catalogos
+    _catalogos = await construir_catalogos(db)
+    return _catalogos
@@ -0,0 +1,70 @@
+import zlib
+from typing import Optional
+
+from core.config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él se negocia solo gzip
+    brotli = None
+
+GZIP = "gzip"
+BROTLI = "br"
+
+# Tipos de contenido que vale la pena comprimir (texto repetitivo)
+_TIPOS_COMPRIMIBLES = (
+    b"application/json",
+    b"application/x-ndjson",
+    b"text/",
+)
+
+
+def elegir_codificacion(accept_encoding: Optional[str]) -> Optional[str]:
+    """Codificación a usar según el Accept-Encoding del cliente (brotli si está disponible)"""
+    if not accept_encoding or not settings.compresion_habilitada:
+        return None
+    aceptadas = set()
+    for parte in accept_encoding.lower().split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        if parametros.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        aceptadas.add(nombre.strip())
+    if brotli is not None and BROTLI in aceptadas:
+        return BROTLI
+    if GZIP in aceptadas:
+        return GZIP
+    return None
+
+
+def comprimible(tipo_contenido: bytes) -> bool:
+    return tipo_contenido.startswith(_TIPOS_COMPRIMIBLES)
+
+
+def comprimir(cuerpo: bytes, codificacion: str) -> bytes:
+    """Comprime un cuerpo completo con la codificación indicada"""
+    if codificacion == BROTLI:
+        return brotli.compress(cuerpo, quality=settings.compresion_nivel_brotli)
+    compresor = zlib.compressobj(settings.compresion_nivel_gzip, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compresor.compress(cuerpo) + compresor.flush()
+
+
+class CompresorIncremental:
+    """Compresión por partes para respuestas en streaming"""
+
+    def __init__(self, codificacion: str):
+        if codificacion == BROTLI:
+            self._compresor = brotli.Compressor(quality=settings.compresion_nivel_brotli)
+        else:
+            self._compresor = zlib.compressobj(settings.compresion_nivel_gzip, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        self._brotli = codificacion == BROTLI
+
+    def parte(self, datos: bytes) -> bytes:
+        """Comprime un fragmento y vacía el buffer para que el cliente lo reciba de inmediato"""
+        if self._brotli:
+            return self._compresor.process(datos) + self._compresor.flush()
+        return self._compresor.compress(datos) + self._compresor.flush(zlib.Z_SYNC_FLUSH)
+
+    def final(self) -> bytes:
+        if self._brotli:
+            return self._compresor.finish()
+        return self._compresor.flush()
@@ -7,6 +7,8 @@ load_dotenv()
 class Settings(BaseSettings):
     # Database
     database_url: str = os.getenv("DATABASE_URL", "")
+    # URL para el engine asíncrono (si está vacía se deriva de DATABASE_URL con asyncpg)
+    async_database_url: str = os.getenv("ASYNC_DATABASE_URL", "")
 
     # API Info
     api_name: str = "Observatorio Ambiental Backend"
@@ -20,6 +22,56 @@ class Settings(BaseSettings):
     ]
     allowed_methods: list = ["GET", "POST", "PUT", "DELETE"]
     allowed_headers: list = ["*"]
+    expose_headers: list = ["X-Next-Cursor", "ETag"]
+
+    # Paginación por cursor de los endpoints masivos
+    paginacion_limite_defecto: int = 1000
+    paginacion_limite_maximo: int = 10000
+
+    # Filas por lote al exportar vistas completas por streaming
+    streaming_lote: int = 2000
+
+    # Exportación Arrow/Parquet: filas por record batch / row group y códec de Parquet
+    exportacion_lote: int = 50000
+    exportacion_compresion_parquet: str = "zstd"
+
+    # Pares (estación, submétrica) máximos por solicitud en /estaciones/datos-submetrica/lote
+    lote_max_pares: int = 100
+
+    # Índice espacial de estaciones: celda de la grilla y primer radio de búsqueda de cercanas
+    espacial_tamano_celda_grados: float = 1.0
+    espacial_radio_inicial_km: float = 50.0
+    espacial_max_cercanas: int = 100
+
+    # Búsqueda por nombre: similitud mínima de trigramas y resultados máximos por consulta
+    busqueda_similitud_minima: float = 0.3
+    busqueda_max_resultados: int = 50
+
+    # Estaciones máximas en /estaciones/comparar
+    comparacion_max_estaciones: int = 500
+
+    # Submétricas: registros no nulos mínimos para considerar una submétrica disponible
+    submetricas_min_registros: int = 2
+
+    # Estructuras en memoria (índice de disponibilidad): segundos entre refrescos, 0 desactiva
+    refresco_intervalo_segundos: int = 3600
+    # Si una estructura falta (falló su construcción), segundos mínimos entre reintentos
+    # desde una solicitud; mientras tanto esas solicitudes responden 503
+    refresco_reintento_segundos: int = 60
+    # Token (Authorization: Bearer) de POST /estaciones/disponibilidad/refrescar; vacío lo deshabilita
+    refresco_token: str = os.getenv("REFRESCO_TOKEN", "")
+
+    # Cache de respuestas de /api/private (bytes ya serializados)
+    cache_habilitado: bool = True
+    cache_ttl_segundos: int = 600
+    cache_memoria_maxima_mb: int = 64
+    cache_entrada_maxima_mb: int = 8
+
+    # Compresión de respuestas (gzip, y brotli si el paquete está instalado)
+    compresion_habilitada: bool = True
+    compresion_minimo_bytes: int = 1024
+    compresion_nivel_gzip: int = 6
+    compresion_nivel_brotli: int = 5
 
     # Contact Info
     contact_email: str = "contacto@observatorio.cl"
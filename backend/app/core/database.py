@@ -1,8 +1,15 @@
+import logging
+from typing import Tuple, Union
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
 # Crear engine con configuración optimizada para performance
 engine = create_engine(
     settings.database_url,
@@ -17,5 +24,94 @@ engine = create_engine(
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+# Parámetros libpq de la URL (?sslmode=..., ?options=...) que asyncpg no entiende: se
+# traducen a argumentos de asyncpg.connect o se descartan
+_LIBPQ_A_ASYNCPG = {
+    "sslmode": ("ssl", str),
+    "connect_timeout": ("timeout", float),
+}
+_ASYNCPG_ADMITIDOS = {"prepared_statement_cache_size", "command_timeout", "target_session_attrs"}
+
+
+def _valor(valor):
+    # make_url entrega una tupla si el parámetro se repite: vale el último
+    return valor[-1] if isinstance(valor, tuple) else valor
+
+
+def _server_settings(options: str) -> dict:
+    """Convierte '-c clave=valor --otra=valor' (options de libpq) en server_settings"""
+    ajustes = {}
+    for parte in options.replace("-c ", "-c").split():
+        for prefijo in ("--", "-c"):
+            if parte.startswith(prefijo) and "=" in parte:
+                clave, valor = parte[len(prefijo):].split("=", 1)
+                ajustes[clave.replace("-", "_")] = valor
+                break
+    return ajustes
+
+
+def _config_async(url: str) -> Tuple[Union[str, URL], dict]:
+    """
+    URL y connect_args del engine asíncrono a partir de una URL de PostgreSQL sincrónica.
+
+    Cambia el driver a asyncpg y traduce las opciones libpq de la query: sslmode pasa a
+    ssl, connect_timeout a timeout, application_name y options (-c clave=valor) a
+    server_settings. Las demás se descartan con una advertencia, porque asyncpg
+    rechazaría la conexión con un argumento desconocido.
+    """
+    for prefijo in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefijo):
+            break
+    else:
+        return url, {}
+
+    url_async = make_url("postgresql+asyncpg://" + url[len(prefijo):])
+    query = {}
+    connect_args = {}
+    server_settings = {}
+    for clave, valor in url_async.query.items():
+        valor = _valor(valor)
+        if clave in _LIBPQ_A_ASYNCPG:
+            destino, tipo = _LIBPQ_A_ASYNCPG[clave]
+            connect_args[destino] = tipo(valor)
+        elif clave == "application_name":
+            server_settings["application_name"] = valor
+        elif clave == "options":
+            server_settings.update(_server_settings(valor))
+        elif clave in _ASYNCPG_ADMITIDOS:
+            query[clave] = valor
+        else:
+            logger.warning("Parámetro '%s' de DATABASE_URL ignorado: asyncpg no lo admite", clave)
+    if server_settings:
+        connect_args["server_settings"] = server_settings
+    return url_async.set(query=query), connect_args
+
+
+if settings.async_database_url:
+    _url_asincronica, _connect_args = settings.async_database_url, {}
+else:
+    _url_asincronica, _connect_args = _config_async(settings.database_url)
+
+# Engine asíncrono: las consultas no bloquean el event loop de uvicorn
+async_engine = create_async_engine(
+    _url_asincronica,
+    connect_args=_connect_args,
+    pool_pre_ping=False,
+    pool_recycle=3600,
+    pool_size=10,
+    max_overflow=20,
+    pool_timeout=5,
+    echo=False
+)
+
+# Session factory asíncrona
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class para modelos
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
@@ -1,5 +1,13 @@
+import secrets
+from typing import Optional
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
-from .database import SessionLocal
+from .config import settings
+from .database import SessionLocal, AsyncSessionLocal
+
+_bearer = HTTPBearer(auto_error=False)
 
 def get_db():
     """Dependencia para obtener sesión de base de datos optimizada"""
@@ -10,4 +18,29 @@ def get_db():
         db.rollback()
         raise
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Dependencia para obtener sesión asíncrona de base de datos"""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+
+def requerir_token_refresco(credenciales: Optional[HTTPAuthorizationCredentials] = Depends(_bearer)):
+    """Dependencia para endpoints administrativos: exige Authorization: Bearer <REFRESCO_TOKEN>"""
+    if not settings.refresco_token:
+        raise HTTPException(
+            status_code=403,
+            detail="Refresco manual deshabilitado: configure REFRESCO_TOKEN"
+        )
+    if credenciales is None or not secrets.compare_digest(
+        credenciales.credentials.encode(), settings.refresco_token.encode()
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="Token de administración inválido",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional
+
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.submetricas import SUBMETRICAS, CATEGORIAS, Submetrica
+
+
+@dataclass(frozen=True)
+class EstadisticaSerie:
+    """Cantidad de registros y rango de periodos de una serie"""
+    registros: int
+    primer_periodo: Optional[str]
+    ultimo_periodo: Optional[str]
+
+
+@dataclass(frozen=True)
+class DisponibilidadEstacion:
+    """Qué datos tiene una estación, precalculado para responder sin consultar la base"""
+    mascara_categorias: int
+    mascara_submetricas: int
+    familias: FrozenSet[str]
+    vistas: Dict[str, EstadisticaSerie]
+    submetricas: Dict[str, EstadisticaSerie]
+
+    @property
+    def categorias(self) -> List[str]:
+        return [categoria for bit, categoria in enumerate(CATEGORIAS) if self.mascara_categorias & (1 << bit)]
+
+    def registros_submetrica(self, nombre: str) -> int:
+        estadistica = self.submetricas.get(nombre)
+        return estadistica.registros if estadistica else 0
+
+
+class IndiceDisponibilidad:
+    """
+    Matriz estación × métrica en memoria.
+
+    Es inmutable: cada refresco construye un índice nuevo y lo reemplaza de forma
+    atómica, así los handlers nunca leen un estado a medio construir.
+    """
+
+    def __init__(self, estaciones: Dict[str, DisponibilidadEstacion], actualizado: datetime):
+        self._estaciones = estaciones
+        self.actualizado = actualizado
+
+    def __len__(self) -> int:
+        return len(self._estaciones)
+
+    def estacion(self, nombre: str) -> DisponibilidadEstacion:
+        """Disponibilidad de una estación (vacía si no tiene datos en ninguna vista)"""
+        return self._estaciones.get(nombre, _SIN_DATOS)
+
+    def estaciones(self) -> Dict[str, DisponibilidadEstacion]:
+        return dict(self._estaciones)
+
+
+_SIN_DATOS = DisponibilidadEstacion(0, 0, frozenset(), {}, {})
+
+
+# Submétricas agrupadas por vista, para construir un agregado por vista
+_SUBMETRICAS_POR_VISTA: Dict[type, List[Submetrica]] = {}
+for _sub in SUBMETRICAS.values():
+    _SUBMETRICAS_POR_VISTA.setdefault(_sub.modelo, []).append(_sub)
+
+_BIT_SUBMETRICA = {nombre: 1 << i for i, nombre in enumerate(SUBMETRICAS)}
+_BIT_CATEGORIA = {categoria: 1 << i for i, categoria in enumerate(CATEGORIAS)}
+
+_indice: Optional[IndiceDisponibilidad] = None
+
+
+def obtener_indice() -> Optional[IndiceDisponibilidad]:
+    """Índice vigente, o None si aún no se ha podido construir"""
+    return _indice
+
+
+def _texto(periodo) -> Optional[str]:
+    return None if periodo is None else str(periodo)
+
+
+def _consulta_vista(modelo: type, subs: List[Submetrica]):
+    """Un agregado por estación con conteos y rango de periodos de la vista y de cada columna"""
+    periodo = subs[0].periodo
+    columnas = [
+        modelo.estacion,
+        func.count(),
+        func.min(periodo),
+        func.max(periodo),
+    ]
+    for sub in subs:
+        periodo_no_nulo = case((sub.valor.isnot(None), periodo))
+        columnas += [
+            func.count(sub.valor),
+            func.min(periodo_no_nulo),
+            func.max(periodo_no_nulo),
+        ]
+    return select(*columnas).group_by(modelo.estacion)
+
+
+async def construir_indice(db: AsyncSession) -> IndiceDisponibilidad:
+    """Construye el índice con una consulta agregada por vista"""
+    acumulado: Dict[str, dict] = {}
+
+    for modelo, subs in _SUBMETRICAS_POR_VISTA.items():
+        filas = (await db.execute(_consulta_vista(modelo, subs))).all()
+        for fila in filas:
+            nombre, registros, primero, ultimo = fila[:4]
+            if nombre is None:
+                continue
+            datos = acumulado.setdefault(nombre, {
+                "categorias": 0, "submetricas_bits": 0, "familias": set(),
+                "vistas": {}, "submetricas": {}
+            })
+            datos["vistas"][modelo.__tablename__] = EstadisticaSerie(registros, _texto(primero), _texto(ultimo))
+            if registros:
+                datos["categorias"] |= _BIT_CATEGORIA[subs[0].categoria]
+                datos["familias"].add(subs[0].familia)
+            for i, sub in enumerate(subs):
+                conteo, primero_sub, ultimo_sub = fila[4 + 3 * i: 7 + 3 * i]
+                if conteo:
+                    datos["submetricas_bits"] |= _BIT_SUBMETRICA[sub.nombre]
+                    datos["submetricas"][sub.nombre] = EstadisticaSerie(
+                        conteo, _texto(primero_sub), _texto(ultimo_sub)
+                    )
+
+    estaciones = {
+        nombre: DisponibilidadEstacion(
+            mascara_categorias=datos["categorias"],
+            mascara_submetricas=datos["submetricas_bits"],
+            familias=frozenset(datos["familias"]),
+            vistas=datos["vistas"],
+            submetricas=datos["submetricas"],
+        )
+        for nombre, datos in acumulado.items()
+    }
+    return IndiceDisponibilidad(estaciones, datetime.now())
+
+
+async def refrescar_indice(db: AsyncSession) -> IndiceDisponibilidad:
+    """Reconstruye el índice y lo publica para todos los handlers del proceso"""
+    global _indice
+    _indice = await construir_indice(db)
+    return _indice
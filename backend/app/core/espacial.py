@@ -0,0 +1,153 @@
+import math
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.catalogos import EstacionCatalogo, obtener_catalogos, refrescar_catalogos
+from core.config import settings
+
+RADIO_TIERRA_KM = 6371.0088
+
+
+def haversine_km(latitud: float, longitud: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Distancia de gran círculo (km) desde un punto a cada coordenada, vectorizada"""
+    lat1, lon1 = math.radians(latitud), math.radians(longitud)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class IndiceEspacial:
+    """
+    Grilla regular de latitud/longitud con las estaciones que tienen coordenadas.
+
+    Cada celda guarda los índices de sus estaciones; una consulta solo revisa las celdas
+    que cubren el área pedida y filtra esos candidatos con numpy. Al igual que el índice
+    de disponibilidad es inmutable y cada refresco publica uno nuevo.
+    """
+
+    def __init__(self, estaciones: List[EstacionCatalogo], tamano_celda: float, actualizado: datetime):
+        self.estaciones = estaciones
+        self.tamano_celda = tamano_celda
+        self.actualizado = actualizado
+        self.latitudes = np.array([e.latitud for e in estaciones], dtype=float)
+        self.longitudes = np.array([e.longitud for e in estaciones], dtype=float)
+        self._columnas = max(1, math.ceil(360 / tamano_celda))
+
+        celdas: Dict[Tuple[int, int], List[int]] = {}
+        for i, (latitud, longitud) in enumerate(zip(self.latitudes, self.longitudes)):
+            celdas.setdefault(self._celda(latitud, longitud), []).append(i)
+        self._celdas = {celda: np.array(indices, dtype=np.intp) for celda, indices in celdas.items()}
+
+    def __len__(self) -> int:
+        return len(self.estaciones)
+
+    def _fila(self, latitud: float) -> int:
+        return int((latitud + 90) // self.tamano_celda)
+
+    def _celda(self, latitud: float, longitud: float) -> Tuple[int, int]:
+        return self._fila(latitud), int((longitud + 180) // self.tamano_celda) % self._columnas
+
+    def _candidatos(self, lat_min: float, lat_max: float, lon_min: float, lon_max: float) -> np.ndarray:
+        """Índices de las estaciones en las celdas que cubren el rectángulo (lon_min > lon_max cruza ±180)"""
+        filas = range(self._fila(lat_min), self._fila(lat_max) + 1)
+        ancho = lon_max - lon_min if lon_min <= lon_max else lon_max - lon_min + 360
+        if ancho >= 360:
+            columnas = range(self._columnas)
+        else:
+            inicio = (lon_min + 180) % 360
+            fin = inicio + ancho
+            primera = int(inicio // self.tamano_celda)
+            if fin < 360:
+                columnas = range(primera, int(fin // self.tamano_celda) + 1)
+            else:
+                # El rango pasa por ±180: se parte en dos tramos
+                ultima = min(int((fin - 360) // self.tamano_celda), primera - 1)
+                columnas = list(range(primera, self._columnas)) + list(range(ultima + 1))
+
+        partes = [
+            self._celdas[(fila, columna)]
+            for fila in filas for columna in columnas
+            if (fila, columna) in self._celdas
+        ]
+        return np.concatenate(partes) if partes else np.empty(0, dtype=np.intp)
+
+    def en_area(self, lat_min: float, lon_min: float, lat_max: float, lon_max: float) -> List[EstacionCatalogo]:
+        """Estaciones dentro del rectángulo; si lon_min > lon_max el área cruza el antimeridiano"""
+        candidatos = self._candidatos(lat_min, lat_max, lon_min, lon_max)
+        latitudes, longitudes = self.latitudes[candidatos], self.longitudes[candidatos]
+        dentro_lat = (latitudes >= lat_min) & (latitudes <= lat_max)
+        if lon_min <= lon_max:
+            dentro_lon = (longitudes >= lon_min) & (longitudes <= lon_max)
+        else:
+            dentro_lon = (longitudes >= lon_min) | (longitudes <= lon_max)
+        elegidos = np.sort(candidatos[dentro_lat & dentro_lon])
+        return [self.estaciones[i] for i in elegidos]
+
+    def en_radio(self, latitud: float, longitud: float, radio_km: float) -> List[Tuple[EstacionCatalogo, float]]:
+        """Estaciones a menos de radio_km del punto, de la más cercana a la más lejana"""
+        angulo = radio_km / RADIO_TIERRA_KM
+        lat_min = latitud - math.degrees(angulo)
+        lat_max = latitud + math.degrees(angulo)
+        if lat_min <= -90 or lat_max >= 90 or angulo >= math.pi / 2:
+            # El círculo contiene un polo: cubre todas las longitudes
+            lon_min, lon_max = -180.0, 180.0
+        else:
+            delta = math.degrees(math.asin(min(1.0, math.sin(angulo) / math.cos(math.radians(latitud)))))
+            lon_min, lon_max = longitud - delta, longitud + delta
+        candidatos = self._candidatos(max(lat_min, -90.0), min(lat_max, 90.0), lon_min, lon_max)
+
+        distancias = haversine_km(latitud, longitud, self.latitudes[candidatos], self.longitudes[candidatos])
+        dentro = distancias <= radio_km
+        candidatos, distancias = candidatos[dentro], distancias[dentro]
+        orden = np.argsort(distancias, kind="stable")
+        return [(self.estaciones[candidatos[i]], float(distancias[i])) for i in orden]
+
+    def cercanas(self, latitud: float, longitud: float, cantidad: int) -> List[Tuple[EstacionCatalogo, float]]:
+        """
+        Las cantidad estaciones más cercanas al punto.
+
+        Busca en radios crecientes (el doble cada vez) hasta encontrar suficientes: todo
+        lo que queda fuera del radio está más lejos que lo encontrado, así que el
+        resultado es exacto.
+        """
+        cantidad = min(cantidad, len(self))
+        if cantidad <= 0:
+            return []
+        radio = settings.espacial_radio_inicial_km
+        while True:
+            encontradas = self.en_radio(latitud, longitud, radio)
+            if len(encontradas) >= cantidad or radio >= math.pi * RADIO_TIERRA_KM:
+                return encontradas[:cantidad]
+            radio *= 2
+
+
+_indice_espacial: Optional[IndiceEspacial] = None
+
+
+def obtener_indice_espacial() -> Optional[IndiceEspacial]:
+    """Índice espacial vigente, o None si aún no se ha podido construir"""
+    return _indice_espacial
+
+
+async def construir_indice_espacial(db: AsyncSession) -> IndiceEspacial:
+    """Construye el índice con las estaciones del catálogo que tienen coordenadas válidas"""
+    catalogos = obtener_catalogos() or await refrescar_catalogos(db)
+    estaciones = [
+        e for e in catalogos.estaciones
+        if e.latitud is not None and e.longitud is not None
+        and -90 <= e.latitud <= 90 and -180 <= e.longitud <= 180
+    ]
+    return IndiceEspacial(estaciones, settings.espacial_tamano_celda_grados, datetime.now())
+
+
+async def refrescar_indice_espacial(db: AsyncSession) -> IndiceEspacial:
+    """Reconstruye el índice espacial y lo publica para todos los handlers del proceso"""
+    global _indice_espacial
+    _indice_espacial = await construir_indice_espacial(db)
+    return _indice_espacial
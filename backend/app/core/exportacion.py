@@ -0,0 +1,108 @@
+import io
+from typing import AsyncIterator, Dict, List
+
+from fastapi import HTTPException
+from sqlalchemy import inspect
+
+from core.config import settings
+from core.database import Base
+from core.vistas import leer_lotes
+import models.aire
+import models.agua
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow es opcional: sin él las exportaciones binarias responden 503
+    pa = None
+    pq = None
+
+MEDIA_ARROW = "application/vnd.apache.arrow.stream"
+MEDIA_PARQUET = "application/vnd.apache.parquet"
+
+
+def _vistas_de(modulo) -> List[type]:
+    return [
+        objeto for objeto in vars(modulo).values()
+        if isinstance(objeto, type) and issubclass(objeto, Base)
+        and objeto is not Base and objeto.__module__ == modulo.__name__
+    ]
+
+
+# Vistas exportables por nombre de tabla (v_mp25_mensual, v_caudal_medio_de_aguas_corrientes, ...)
+VISTAS_EXPORTABLES: Dict[str, type] = {
+    modelo.__tablename__: modelo
+    for modelo in _vistas_de(models.aire) + _vistas_de(models.agua)
+}
+
+
+def requerir_pyarrow():
+    if pa is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Exportación binaria no disponible: falta el paquete pyarrow"
+        )
+
+
+def esquema_arrow(modelo: type) -> "pa.Schema":
+    """Esquema Arrow con los nombres de atributo del modelo y el tipo de cada columna"""
+    tipos = {str: pa.string(), float: pa.float64(), int: pa.int64()}
+    return pa.schema([
+        pa.field(propiedad.key, tipos[propiedad.columns[0].type.python_type])
+        for propiedad in inspect(modelo).column_attrs
+    ])
+
+
+def _lote_arrow(filas, esquema: "pa.Schema") -> "pa.RecordBatch":
+    columnas = list(zip(*filas))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(valores, type=campo.type) for valores, campo in zip(columnas, esquema)],
+        schema=esquema
+    )
+
+
+class _Sumidero(io.RawIOBase):
+    """Archivo de solo escritura que entrega lo escrito en cada vaciado"""
+
+    def __init__(self):
+        self._partes: List[bytes] = []
+        self._posicion = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, datos) -> int:
+        self._partes.append(bytes(datos))
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self) -> int:
+        return self._posicion
+
+    def vaciar(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes = []
+        return datos
+
+
+async def arrow_ipc(consulta, esquema: "pa.Schema") -> AsyncIterator[bytes]:
+    """Stream Arrow IPC: un record batch por lote leído de la base de datos"""
+    sumidero = _Sumidero()
+    with pa.ipc.new_stream(sumidero, esquema) as escritor:
+        async for filas in leer_lotes(consulta, settings.exportacion_lote):
+            escritor.write_batch(_lote_arrow(filas, esquema))
+            yield sumidero.vaciar()
+    yield sumidero.vaciar()
+
+
+async def parquet(consulta, esquema: "pa.Schema") -> AsyncIterator[bytes]:
+    """Archivo Parquet: un row group por lote; el pie del archivo se envía al final"""
+    sumidero = _Sumidero()
+    escritor = pq.ParquetWriter(sumidero, esquema, compression=settings.exportacion_compresion_parquet)
+    try:
+        async for filas in leer_lotes(consulta, settings.exportacion_lote):
+            escritor.write_batch(_lote_arrow(filas, esquema))
+            yield sumidero.vaciar()
+    finally:
+        escritor.close()
+    yield sumidero.vaciar()
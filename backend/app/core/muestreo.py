@@ -0,0 +1,124 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import inspect
+
+
+def posicion_temporal(periodo) -> float:
+    """Periodo ('yyyy', 'yyyy-mm', 'yyyy-mm-dd' o año entero) como año fraccionario"""
+    partes = str(periodo).split("-")
+    anio = float(partes[0])
+    mes = float(partes[1]) if len(partes) > 1 else 1.0
+    dia = float(partes[2][:2]) if len(partes) > 2 else 1.0
+    return anio + (mes - 1) / 12 + (dia - 1) / 365
+
+
+def _posiciones(periodos: Sequence) -> np.ndarray:
+    try:
+        return np.fromiter((posicion_temporal(p) for p in periodos), dtype=float, count=len(periodos))
+    except (ValueError, IndexError):
+        # Periodo con formato inesperado: se usa el orden de los registros como eje
+        return np.arange(len(periodos), dtype=float)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, umbral: int) -> np.ndarray:
+    """
+    Índices de los puntos elegidos por Largest-Triangle-Three-Buckets.
+
+    Conserva el primero y el último; el resto se reparte en umbral-2 grupos y de cada
+    uno se elige el punto que forma el triángulo más grande con el punto elegido en el
+    grupo anterior y el promedio del grupo siguiente. Las áreas de cada grupo y los
+    promedios se calculan vectorizados; solo el recorrido de grupos es secuencial.
+    """
+    n = len(x)
+    if umbral >= n or umbral < 3:
+        return np.arange(n)
+
+    bordes = np.linspace(1, n - 1, umbral - 1).astype(np.intp)
+    largos = np.diff(bordes)
+    promedio_x = np.add.reduceat(x[:n - 1], bordes[:-1]) / largos
+    promedio_y = np.add.reduceat(y[:n - 1], bordes[:-1]) / largos
+    # El "grupo siguiente" del último grupo es el último punto
+    siguiente_x = np.append(promedio_x[1:], x[n - 1])
+    siguiente_y = np.append(promedio_y[1:], y[n - 1])
+
+    elegidos = np.empty(umbral, dtype=np.intp)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    anterior = 0
+    for i in range(umbral - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        ax, ay = x[anterior], y[anterior]
+        areas = np.abs(
+            (ax - siguiente_x[i]) * (y[inicio:fin] - ay)
+            - (ax - x[inicio:fin]) * (siguiente_y[i] - ay)
+        )
+        anterior = inicio + int(np.argmax(areas))
+        elegidos[i + 1] = anterior
+    return elegidos
+
+
+def reducir_serie(periodos: Sequence, valores: Sequence, max_puntos: Optional[int]) -> np.ndarray:
+    """Índices (ordenados) a conservar de una serie con valores no nulos"""
+    if not max_puntos or len(valores) <= max_puntos:
+        return np.arange(len(valores))
+    return lttb(_posiciones(periodos), np.asarray(valores, dtype=float), max_puntos)
+
+
+def alinear_series(filas, estaciones: List[str]):
+    """
+    Une series de varias estaciones sobre un eje común de periodos (outer join).
+
+    Recibe filas (estación, periodo, valor) ordenadas por periodo y devuelve el eje de
+    periodos y, por estación, sus valores alineados con None donde no hay registro. La
+    matriz estación × periodo se llena con una sola asignación vectorizada.
+    """
+    posicion_periodo: Dict = {}
+    posicion_estacion = {nombre: i for i, nombre in enumerate(estaciones)}
+    filas_i, columnas_i, valores = [], [], []
+    for estacion, periodo, valor in filas:
+        filas_i.append(posicion_estacion[estacion])
+        columnas_i.append(posicion_periodo.setdefault(periodo, len(posicion_periodo)))
+        valores.append(valor)
+
+    matriz = np.full((len(estaciones), len(posicion_periodo)), np.nan)
+    matriz[filas_i, columnas_i] = valores
+    alineadas = np.where(np.isnan(matriz), None, matriz).tolist()
+
+    periodos = [str(periodo) for periodo in posicion_periodo]
+    return periodos, dict(zip(estaciones, alineadas))
+
+
+def reducir_filas(modelo: type, nombres: List[str], filas: list, max_puntos: Optional[int]) -> list:
+    """
+    Submuestrea las filas de una vista manteniendo la forma de cada serie.
+
+    Una vista puede mezclar varias series (por ejemplo un metal por parámetro POAL): las
+    columnas de la clave distintas del periodo identifican la serie, y cada una se reduce
+    por separado a max_puntos. Si la vista tiene varias columnas de valor, el cupo se
+    reparte entre ellas y se conserva la unión de los puntos elegidos para cada columna.
+    """
+    if not max_puntos or len(filas) <= max_puntos:
+        return filas
+
+    mapper = inspect(modelo)
+    claves = [mapper.get_property_by_column(c).key for c in mapper.primary_key]
+    i_periodo = nombres.index(claves[0])
+    i_serie = [nombres.index(clave) for clave in claves[1:]]
+    i_valores = [i for i, nombre in enumerate(nombres) if nombre not in claves]
+
+    series: Dict[tuple, List[int]] = {}
+    for posicion, fila in enumerate(filas):
+        series.setdefault(tuple(fila[i] for i in i_serie), []).append(posicion)
+
+    cupo = max(3, max_puntos // max(1, len(i_valores)))
+    conservar = set()
+    for posiciones in series.values():
+        for i_valor in i_valores:
+            con_valor = [p for p in posiciones if filas[p][i_valor] is not None]
+            elegidos = reducir_serie(
+                [filas[p][i_periodo] for p in con_valor],
+                [filas[p][i_valor] for p in con_valor],
+                cupo
+            )
+            conservar.update(con_valor[i] for i in elegidos)
+    return [fila for posicion, fila in enumerate(filas) if posicion in conservar]
@@ -0,0 +1,70 @@
+import calendar
+
+from sqlalchemy import case, cast, func, inspect, literal_column, Integer
+
+# Dígitos de la clave numérica según la columna de periodo de la vista
+_DIGITOS_POR_COLUMNA = {
+    "anio": 4,  # yyyy (la columna ya es entera)
+    "mes": 6,   # yyyymm, desde 'yyyy-mm'
+    "dia": 8,   # yyyymmdd, desde 'yyyy-mm-dd'
+}
+
+# Formato que debe tener el texto para convertirlo a clave (con o sin guiones); las filas
+# que no lo cumplen tienen clave NULL en lugar de hacer fallar el CAST de toda la consulta
+PATRON_PERIODO = {
+    6: "^[0-9]{4}-?[0-9]{2}",
+    8: "^[0-9]{4}-?[0-9]{2}-?[0-9]{2}",
+}
+
+
+def columna_periodo(modelo: type):
+    """Columna de periodo de la vista (mes, día o año; siempre la primera de la clave)"""
+    return inspect(modelo).primary_key[0]
+
+
+def digitos_periodo(modelo: type) -> int:
+    """Largo de la clave de periodo de la vista (4 anual, 6 mensual, 8 diaria)"""
+    mapper = inspect(modelo)
+    return _DIGITOS_POR_COLUMNA[mapper.get_property_by_column(mapper.primary_key[0]).key]
+
+
+def clave_periodo(modelo: type):
+    """
+    Expresión SQL con el periodo de la vista como entero ordenable (yyyy, yyyymm o yyyymmdd).
+
+    Los periodos mensuales y diarios se guardan como texto; la clave permite comparar
+    rangos y ordenar numéricamente. Un texto con otro formato da NULL (queda fuera de
+    los rangos y en un extremo del orden) en lugar de hacer fallar la consulta.
+    Los argumentos van como literales (no parámetros) para que la expresión coincida
+    con los índices de migrations/001_indices_periodo.sql.
+    """
+    columna = columna_periodo(modelo)
+    digitos = digitos_periodo(modelo)
+    if digitos == 4:
+        return columna
+    sin_guiones = func.replace(columna, literal_column("'-'"), literal_column("''"))
+    return case((
+        columna.regexp_match(literal_column(f"'{PATRON_PERIODO[digitos]}'")),
+        cast(func.substr(sin_guiones, literal_column("1"), literal_column(str(digitos))), Integer)
+    ))
+
+
+def clave_de_texto(valor: str, digitos: int, final: bool = False) -> int:
+    """
+    Convierte un periodo recibido por query ('yyyy', 'yyyy-mm' o 'yyyy-mm-dd') a clave.
+
+    Las partes omitidas cubren el periodo completo: como límite inicial '2020' equivale
+    al comienzo del año y como límite final (final=True) a su último día.
+    Lanza ValueError si el texto no tiene ese formato o la fecha no existe ('2020-13',
+    '2021-02-29').
+    """
+    partes = [int(parte) for parte in valor.strip().split("-")]
+    if not 1 <= len(partes) <= 3 or not 1000 <= partes[0] <= 9999:
+        raise ValueError(valor)
+    if len(partes) >= 2 and not 1 <= partes[1] <= 12:
+        raise ValueError(valor)
+    if len(partes) == 3 and not 1 <= partes[2] <= calendar.monthrange(partes[0], partes[1])[1]:
+        raise ValueError(valor)
+    partes += [99 if final else 0] * (3 - len(partes))
+    anio, mes, dia = partes
+    return (anio * 10000 + mes * 100 + dia) // 10 ** (8 - digitos)
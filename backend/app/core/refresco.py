@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Optional, TypeVar
+
+from fastapi import HTTPException
+
+from core.agregados import refrescar_agregados
+from core.busqueda import refrescar_indice_busqueda
+from core.cache import cache_respuestas
+from core.catalogos import refrescar_catalogos
+from core.config import settings
+from core.database import AsyncSessionLocal
+from core.disponibilidad import refrescar_indice
+from core.espacial import refrescar_indice_espacial
+from core.version import refrescar_version
+
+logger = logging.getLogger(__name__)
+
+# Estructuras en memoria que se reconstruyen desde la base de datos, en orden (los
+# catálogos primero: el índice espacial y el de búsqueda se construyen a partir de ellos;
+# la versión de los datos al final, cuando todo lo que se sirve ya está actualizado)
+_REFRESCOS = [
+    refrescar_catalogos,
+    refrescar_indice,
+    refrescar_indice_espacial,
+    refrescar_agregados,
+    refrescar_indice_busqueda,
+    refrescar_version,
+]
+
+
+T = TypeVar("T")
+
+# Un solo refresco a la vez: la tarea periódica, POST /refrescar y las solicitudes que
+# encuentran una estructura vacía comparten el candado
+_candado = asyncio.Lock()
+_refrescos_completados = 0
+_ultimo_refresco: Optional[float] = None
+
+
+async def refrescar_todo():
+    """
+    Reconstruye todas las estructuras en memoria con una sesión propia.
+
+    Si ya hay un refresco en curso se espera a que termine y no se repite: quien llegó
+    mientras tanto recibe el resultado de ese refresco.
+    """
+    global _refrescos_completados, _ultimo_refresco
+    completados = _refrescos_completados
+    async with _candado:
+        if _refrescos_completados != completados:
+            return
+
+        try:
+            async with AsyncSessionLocal() as db:
+                for refresco in _REFRESCOS:
+                    try:
+                        await refresco(db)
+                    except Exception:
+                        # Si falla, se conserva la versión anterior (si la hay)
+                        logger.exception("Error al ejecutar %s", refresco.__name__)
+                        await db.rollback()
+        finally:
+            _refrescos_completados += 1
+            _ultimo_refresco = time.monotonic()
+
+        # Los datos pudieron cambiar: las respuestas cacheadas ya no son confiables
+        cache_respuestas.vaciar()
+
+
+async def estructura_vigente(obtener: Callable[[], Optional[T]], descripcion: str) -> T:
+    """
+    Estructura en memoria para un handler, o 503 si no existe.
+
+    Si falta (falló su construcción) se espera el refresco en curso, o se lanza uno si el
+    último intento fue hace más de refresco_reintento_segundos; las solicitudes
+    concurrentes comparten ese único refresco en lugar de reconstruir cada una.
+    """
+    estructura = obtener()
+    if estructura is not None:
+        return estructura
+
+    if (
+        _candado.locked()
+        or _ultimo_refresco is None
+        or time.monotonic() - _ultimo_refresco >= settings.refresco_reintento_segundos
+    ):
+        await refrescar_todo()
+        estructura = obtener()
+    if estructura is None:
+        raise HTTPException(
+            status_code=503,
+            detail=f"{descripcion} no está disponible; reintente más tarde"
+        )
+    return estructura
+
+
+async def ciclo_refresco():
+    """Tarea de fondo que refresca periódicamente las estructuras en memoria"""
+    intervalo = settings.refresco_intervalo_segundos
+    if intervalo <= 0:
+        return
+    while True:
+        await asyncio.sleep(intervalo)
+        await refrescar_todo()
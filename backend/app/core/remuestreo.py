@@ -0,0 +1,117 @@
+from typing import List, Literal, Optional
+
+from sqlalchemy import select, func, case, literal_column, Integer
+
+from core.periodos import clave_periodo, digitos_periodo
+
+Frecuencia = Literal["trimestre", "temporada", "anio_hidrologico", "anio"]
+Reductor = Literal["mean", "sum", "min", "max", "count"]
+
+_REDUCTORES = {
+    "mean": func.avg,
+    "sum": func.sum,
+    "min": func.min,
+    "max": func.max,
+    "count": func.count,
+}
+
+# Estaciones del año (hemisferio sur, meteorológicas): diciembre abre el verano del año siguiente
+_TEMPORADAS = {1: "verano", 2: "otoño", 3: "invierno", 4: "primavera"}
+
+# El año hidrológico en Chile comienza en abril
+MES_INICIO_ANIO_HIDROLOGICO = 4
+
+
+def _n(valor: int):
+    # Constantes como literales: el GROUP BY debe repetir exactamente la expresión del SELECT
+    return literal_column(str(valor), Integer)
+
+
+def _grupos(modelo: type, frecuencia: str):
+    """
+    Expresiones SQL (año del grupo, subperiodo dentro del año) para agrupar.
+
+    ValueError si la frecuencia no aplica a la serie (una serie anual solo admite 'anio').
+    """
+    digitos = digitos_periodo(modelo)
+    clave = clave_periodo(modelo)
+    if digitos == 4:
+        if frecuencia != "anio":
+            raise ValueError(f"La serie es anual: solo admite frecuencia 'anio' (recibido '{frecuencia}')")
+        return clave, None
+
+    anio_mes = clave if digitos == 6 else clave // _n(100)
+    anio = anio_mes // _n(100)
+    mes = anio_mes % _n(100)
+
+    if frecuencia == "trimestre":
+        return anio, (mes + _n(2)) // _n(3)
+    if frecuencia == "temporada":
+        return anio + case((mes == _n(12), _n(1)), else_=_n(0)), (mes % _n(12)) // _n(3) + _n(1)
+    if frecuencia == "anio_hidrologico":
+        return anio - case((mes < _n(MES_INICIO_ANIO_HIDROLOGICO), _n(1)), else_=_n(0)), None
+    return anio, None
+
+
+def etiqueta_periodo(frecuencia: str, anio: int, subperiodo: Optional[int]) -> str:
+    """Texto del periodo agregado: '2020-T1', '2020-verano', '2020-2021' o '2020'"""
+    if frecuencia == "trimestre":
+        return f"{anio}-T{subperiodo}"
+    if frecuencia == "temporada":
+        return f"{anio}-{_TEMPORADAS[subperiodo]}"
+    if frecuencia == "anio_hidrologico":
+        return f"{anio}-{anio + 1}"
+    return str(anio)
+
+
+def consulta_remuestreo(
+    modelo: type,
+    columna_valor,
+    condiciones: list,
+    frecuencia: str,
+    reductor: str,
+    columnas_serie: Optional[list] = None,
+):
+    """
+    Agregado de una serie por periodo (y por serie, si la vista mezcla varias) en SQL.
+
+    Cada fila resultante es (*series, año, subperiodo, valor agregado, registros no nulos),
+    ordenada cronológicamente dentro de cada serie. Los registros con un periodo mal
+    formado (clave NULL) no pertenecen a ningún grupo y se excluyen. ValueError si la
+    frecuencia no aplica a la serie.
+    """
+    anio, subperiodo = _grupos(modelo, frecuencia)
+    series = list(columnas_serie or [])
+    agrupacion = series + [anio.label("anio_grupo")]
+    if subperiodo is not None:
+        agrupacion.append(subperiodo.label("subperiodo"))
+
+    consulta = select(
+        *agrupacion,
+        _REDUCTORES[reductor](columna_valor).label("valor"),
+        func.count(columna_valor).label("registros"),
+    ).where(*condiciones, columna_valor.isnot(None), clave_periodo(modelo).isnot(None))
+
+    claves = series + [anio] + ([subperiodo] if subperiodo is not None else [])
+    return consulta.group_by(*claves).order_by(*claves)
+
+
+def puntos_remuestreo(filas, frecuencia: str, cantidad_series: int = 0) -> List[dict]:
+    """Convierte las filas de consulta_remuestreo en puntos etiquetados"""
+    puntos = []
+    for fila in filas:
+        series = fila[:cantidad_series]
+        resto = fila[cantidad_series:]
+        if len(resto) == 4:
+            anio, subperiodo, valor, registros = resto
+        else:
+            (anio, valor, registros), subperiodo = resto, None
+        punto = {
+            "periodo": etiqueta_periodo(frecuencia, int(anio), subperiodo),
+            "valor": None if valor is None else float(valor),
+            "registros": registros,
+        }
+        if cantidad_series:
+            punto["serie"] = " / ".join(str(s) for s in series)
+        puntos.append(punto)
+    return puntos
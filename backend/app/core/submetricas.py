@@ -0,0 +1,261 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, func, exists, case, or_, true
+
+from core.periodos import clave_periodo
+from models.aire import (
+    VTemperatura, VHumedadRadiacionUV, VNumEventosDeOlasDeCalor,
+    VMp25Anual, VMp25Mensual, VMp10Anual, VMp10Mensual,
+    VO3Anual, VO3Mensual, VSo2Anual, VSo2Mensual,
+    VNo2Anual, VNo2Mensual, VCoAnual, VCoMensual,
+    VNoAnual, VNoMensual, VNoxAnual, VNoxMensual
+)
+
+# ============================
+# Categorías de métricas (nombres visibles en el frontend)
+# ============================
+CATEGORIA_TEMPERATURA = "Temperatura"
+CATEGORIA_HUMEDAD = "Humedad Radiación y UV"
+CATEGORIA_CONTAMINANTES = "Contaminantes"
+CATEGORIA_OLAS_CALOR = "Eventos de Olas de Calor"
+
+
+@dataclass(frozen=True)
+class Submetrica:
+    """Definición de una submétrica: de qué vista y columnas se obtienen sus datos"""
+    nombre: str
+    categoria: str
+    familia: str
+    modelo: type
+    columna_periodo: str
+    columna_valor: str
+
+    @property
+    def periodo(self):
+        return getattr(self.modelo, self.columna_periodo)
+
+    @property
+    def valor(self):
+        return getattr(self.modelo, self.columna_valor)
+
+    @property
+    def clave_periodo(self):
+        """Periodo como entero ordenable (yyyy o yyyymm)"""
+        return clave_periodo(self.modelo)
+
+    @property
+    def estacion(self):
+        return self.modelo.estacion
+
+    @property
+    def periodicidad(self) -> str:
+        return "anual" if self.columna_periodo == "anio" else "mensual"
+
+
+# ============================
+# Definición declarativa de submétricas
+# ============================
+# Agregar un contaminante o columna nueva solo requiere editar estas tablas.
+
+_TEMPERATURA = [
+    ("temp_max_absoluta", "Temperatura Máxima Absoluta"),
+    ("temp_min_absoluta", "Temperatura Mínima Absoluta"),
+    ("temp_max_med", "Temperatura Máxima Media"),
+    ("temp_min_med", "Temperatura Mínima Media"),
+    ("temp_med", "Temperatura Media"),
+]
+
+_HUMEDAD = [
+    ("humedad_rel_med_mens", "Humedad Relativa Media Mensual"),
+    ("rad_global_med", "Radiación Global Media"),
+    ("uvb_prom", "UVB Promedio"),
+]
+
+_ANUAL_BASE = [
+    ("max_hor_anual", "Máximo Horario Anual"),
+    ("min_hor_anual", "Mínimo Horario Anual"),
+    ("perc50", "Percentil 50"),
+    ("perc90", "Percentil 90"),
+    ("perc95", "Percentil 95"),
+    ("perc98", "Percentil 98"),
+]
+
+_ANUAL_CON_P99 = _ANUAL_BASE + [("perc99", "Percentil 99")]
+
+# SO2 usa "min_anual" en vez de "min_hor_anual"
+_ANUAL_SO2 = [
+    ("min_anual", "Mínimo Anual") if sufijo == "min_hor_anual" else (sufijo, etiqueta)
+    for sufijo, etiqueta in _ANUAL_CON_P99
+]
+
+# (familia, prefijo visible, vista anual, vista mensual, columnas anuales)
+_CONTAMINANTES = [
+    ("mp25", "MP2.5", VMp25Anual, VMp25Mensual, _ANUAL_BASE),
+    ("mp10", "MP10", VMp10Anual, VMp10Mensual, _ANUAL_BASE),
+    ("o3", "O3", VO3Anual, VO3Mensual, _ANUAL_CON_P99),
+    ("so2", "SO2", VSo2Anual, VSo2Mensual, _ANUAL_SO2),
+    ("no2", "NO2", VNo2Anual, VNo2Mensual, _ANUAL_CON_P99),
+    ("co", "CO", VCoAnual, VCoMensual, _ANUAL_CON_P99),
+    ("no", "NO", VNoAnual, VNoMensual, _ANUAL_CON_P99),
+    ("nox", "NOX", VNoxAnual, VNoxMensual, _ANUAL_CON_P99),
+]
+
+
+def _construir_registro() -> Dict[str, Submetrica]:
+    registro: List[Submetrica] = []
+
+    for columna, nombre in _TEMPERATURA:
+        registro.append(Submetrica(nombre, CATEGORIA_TEMPERATURA, "temperatura", VTemperatura, "mes", columna))
+
+    for columna, nombre in _HUMEDAD:
+        registro.append(Submetrica(nombre, CATEGORIA_HUMEDAD, "humedad_radiacion_uv", VHumedadRadiacionUV, "mes", columna))
+
+    for familia, prefijo, anual, mensual, columnas in _CONTAMINANTES:
+        for sufijo, etiqueta in columnas:
+            registro.append(Submetrica(
+                f"{prefijo} - {etiqueta}", CATEGORIA_CONTAMINANTES, familia, anual, "anio", f"{familia}_{sufijo}"
+            ))
+        registro.append(Submetrica(
+            f"{prefijo} - Media Mensual", CATEGORIA_CONTAMINANTES, familia, mensual, "mes", f"{familia}_med_mens"
+        ))
+
+    registro.append(Submetrica(
+        "Número de Eventos de Olas de Calor", CATEGORIA_OLAS_CALOR, "olas_calor",
+        VNumEventosDeOlasDeCalor, "mes", "num_eventos_de_olas_de_calor"
+    ))
+
+    # Validar que todas las columnas existen en su modelo al importar
+    for sub in registro:
+        for columna in (sub.columna_periodo, sub.columna_valor):
+            if not hasattr(sub.modelo, columna):
+                raise AttributeError(f"{sub.modelo.__name__} no tiene la columna '{columna}'")
+
+    return {sub.nombre: sub for sub in registro}
+
+
+# Registro nombre -> submétrica (el orden de inserción es el orden de presentación)
+SUBMETRICAS: Dict[str, Submetrica] = _construir_registro()
+
+# Submétricas agrupadas por categoría
+SUBMETRICAS_POR_CATEGORIA: Dict[str, List[Submetrica]] = {}
+for _sub in SUBMETRICAS.values():
+    SUBMETRICAS_POR_CATEGORIA.setdefault(_sub.categoria, []).append(_sub)
+
+# Orden de presentación de las categorías; la posición define su bit en la máscara
+CATEGORIAS: List[str] = [
+    CATEGORIA_TEMPERATURA,
+    CATEGORIA_HUMEDAD,
+    CATEGORIA_CONTAMINANTES,
+    CATEGORIA_OLAS_CALOR,
+]
+
+# Vistas (sin repetir) que aportan datos a cada categoría
+VISTAS_POR_CATEGORIA: Dict[str, List[type]] = {
+    categoria: list(dict.fromkeys(sub.modelo for sub in SUBMETRICAS_POR_CATEGORIA[categoria]))
+    for categoria in CATEGORIAS
+}
+
+# Vistas (sin repetir) que aportan datos a cada familia de métricas
+VISTAS_POR_FAMILIA: Dict[str, List[type]] = {}
+for _sub in SUBMETRICAS.values():
+    _vistas = VISTAS_POR_FAMILIA.setdefault(_sub.familia, [])
+    if _sub.modelo not in _vistas:
+        _vistas.append(_sub.modelo)
+
+
+def resolver_categoria(metrica: str) -> Optional[str]:
+    """Traduce el texto de métrica recibido por query a una categoría del registro"""
+    metrica = metrica.lower()
+    if metrica == "temperatura":
+        return CATEGORIA_TEMPERATURA
+    if "humedad" in metrica or "radiación" in metrica or "radiacion" in metrica:
+        return CATEGORIA_HUMEDAD
+    if metrica == "contaminantes":
+        return CATEGORIA_CONTAMINANTES
+    if "olas de calor" in metrica or "eventos" in metrica:
+        return CATEGORIA_OLAS_CALOR
+    return None
+
+
+# ============================
+# Constructores genéricos de consultas
+# ============================
+
+def consulta_conteos(subs: List[Submetrica], nombre_estacion: str):
+    """
+    Una sola sentencia con la cantidad de registros no nulos de cada submétrica.
+
+    Se calcula un agregado COUNT(columna) por vista con todas sus columnas de valor a la
+    vez, y las vistas se combinan en un mismo SELECT (cada agregado devuelve una fila).
+    La columna resultante i corresponde a subs[i].
+    """
+    por_vista: Dict[type, List[int]] = {}
+    for indice, sub in enumerate(subs):
+        por_vista.setdefault(sub.modelo, []).append(indice)
+
+    columnas = [None] * len(subs)
+    origen = None
+    for modelo, indices in por_vista.items():
+        agregado = select(*[
+            func.count(subs[i].valor).label(f"c{i}") for i in indices
+        ]).where(modelo.estacion == nombre_estacion).subquery()
+        for i in indices:
+            columnas[i] = agregado.c[f"c{i}"]
+        origen = agregado if origen is None else origen.join(agregado, true())
+
+    return select(*columnas).select_from(origen)
+
+
+def consulta_datos(sub: Submetrica, nombre_estacion: str):
+    """Serie (periodo, valor) de la submétrica para una estación, ordenada por periodo"""
+    return select(sub.periodo, sub.valor).where(
+        sub.estacion == nombre_estacion,
+        sub.valor.isnot(None)
+    ).order_by(sub.clave_periodo)
+
+
+def consulta_lote(modelo: type, subs: List[Submetrica], nombres_estacion: List[str]):
+    """
+    Series de varias submétricas de una misma vista para varias estaciones en una sentencia.
+
+    Filas (estación, periodo, valor_0, ..., valor_n) ordenadas por estación y periodo; el
+    valor i corresponde a subs[i] y puede ser nulo si solo otra submétrica tiene dato.
+    """
+    return select(
+        modelo.estacion, subs[0].periodo, *[sub.valor for sub in subs]
+    ).where(
+        modelo.estacion.in_(nombres_estacion),
+        or_(*[sub.valor.isnot(None) for sub in subs])
+    ).order_by(modelo.estacion, subs[0].clave_periodo)
+
+
+def consulta_comparacion(sub: Submetrica, nombres_estacion: List[str]):
+    """Registros no nulos de la submétrica para varias estaciones, ordenados por periodo"""
+    return select(sub.estacion, sub.periodo, sub.valor).where(
+        sub.estacion.in_(nombres_estacion),
+        sub.valor.isnot(None)
+    ).order_by(sub.clave_periodo, sub.estacion)
+
+
+def expresion_mascara_categorias(columna_estacion):
+    """
+    Expresión SQL con un bit por categoría que tiene al menos un registro para la estación.
+
+    Cada categoría se resuelve con sondas EXISTS correlacionadas que se detienen en la
+    primera fila encontrada, por lo que toda la disponibilidad cabe en una sola sentencia.
+    """
+    mascara = None
+    for bit, categoria in enumerate(CATEGORIAS):
+        existe = or_(*[
+            exists().where(modelo.estacion == columna_estacion)
+            for modelo in VISTAS_POR_CATEGORIA[categoria]
+        ])
+        termino = case((existe, 1 << bit), else_=0)
+        mascara = termino if mascara is None else mascara + termino
+    return mascara
+
+
+def categorias_de_mascara(mascara: int) -> List[str]:
+    """Decodifica la máscara de disponibilidad a la lista de categorías con datos"""
+    return [categoria for bit, categoria in enumerate(CATEGORIAS) if mascara & (1 << bit)]
@@ -0,0 +1,82 @@
+import hashlib
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import Text, cast, func, inspect, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.exportacion import VISTAS_EXPORTABLES
+from models.entidades_agua import EntidadAgua
+from models.estaciones import Estacion
+
+# Todo lo que leen los endpoints de /api/private: las vistas de aire y agua y los
+# catálogos de estaciones y entidades de agua
+_VISTAS_VERSIONADAS: List[type] = [Estacion, EntidadAgua] + [
+    VISTAS_EXPORTABLES[nombre] for nombre in sorted(VISTAS_EXPORTABLES)
+]
+
+
+class VersionDatos:
+    """Huella del contenido de todas las vistas en el último refresco"""
+
+    def __init__(self, huella: str, actualizado: datetime):
+        self.huella = huella
+        self.actualizado = actualizado
+
+
+_version: Optional[VersionDatos] = None
+
+
+def obtener_version() -> Optional[VersionDatos]:
+    """Versión vigente, o None si aún no se ha podido calcular"""
+    return _version
+
+
+def consulta_resumen(modelo: type):
+    """
+    (filas, suma de hashes por fila) de una vista, calculado en la base de datos.
+
+    Cada fila se serializa como texto (NULL explícito) y se resume con hashtextextended
+    a un bigint; la suma (numeric en Postgres, sin desborde) no depende del orden de
+    lectura, así que no hace falta ordenar ni traer filas al proceso.
+    """
+    nulo = literal_column("'\\N'")
+    texto_fila = func.concat_ws(
+        literal_column("'|'"),
+        *[func.coalesce(cast(propiedad.columns[0], Text), nulo) for propiedad in inspect(modelo).column_attrs]
+    )
+    return select(
+        func.count(),
+        func.sum(func.hashtextextended(texto_fila, literal_column("0"))),
+    ).select_from(modelo)
+
+
+async def construir_version(db: AsyncSession) -> VersionDatos:
+    """
+    Combina el resumen de cada vista (una consulta de agregación por vista).
+
+    Solo depende del contenido, así que todos los procesos que leen los mismos datos
+    calculan la misma huella, y cualquier cambio en un valor, un periodo o un catálogo
+    la cambia.
+    """
+    resumen = hashlib.blake2b(digest_size=16)
+    for modelo in _VISTAS_VERSIONADAS:
+        filas, suma = (await db.execute(consulta_resumen(modelo))).one()
+        resumen.update(f"{modelo.__tablename__}:{filas}:{suma}|".encode())
+    return VersionDatos(resumen.hexdigest(), datetime.now())
+
+
+async def refrescar_version(db: AsyncSession) -> VersionDatos:
+    """
+    Recalcula la versión de los datos y la publica para todos los handlers del proceso.
+
+    Si falla se descarta la versión anterior: ya no se puede afirmar que describe los
+    datos, y sin versión no se emiten ETags.
+    """
+    global _version
+    try:
+        _version = await construir_version(db)
+    except Exception:
+        _version = None
+        raise
+    return _version
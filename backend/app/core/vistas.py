@@ -0,0 +1,451 @@
+import base64
+import csv
+import io
+import json
+from typing import Dict, List, Literal, Optional, Type, Union
+
+import orjson
+from fastapi import Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, create_model
+from sqlalchemy import select, tuple_, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.database import AsyncSessionLocal
+from core.periodos import clave_periodo, clave_de_texto, digitos_periodo
+from models.agua import (
+    VColiformesFecalesEnMatrizBiologica, VColiformesFecalesEnMatrizAcuosa,
+    VMetalesTotalesEnLaMatrizSedimentaria, VMetalesDisueltosEnLaMatrizAcuosa,
+    VCaudalMedioDeAguasCorrientes, VCantidadDeAguaCaida, VVolumenDelEmbalsePorEmbalse,
+    VAlturaNieveEquivalenteEnAgua, VNivelEstaticoDeAguasSubterraneas
+)
+from models.estaciones import Estacion
+import models.aire
+
+# Header con el cursor opaco de la página siguiente
+HEADER_CURSOR = "X-Next-Cursor"
+
+# Formatos de exportación por streaming, negociados con el header Accept
+MEDIA_NDJSON = "application/x-ndjson"
+MEDIA_CSV = "text/csv"
+
+# Formatos JSON seleccionables con ?format=
+FORMATO_FILAS = "rows"
+FORMATO_COLUMNAS = "columns"
+Formato = Literal["rows", "columns"]
+
+# Documentación OpenAPI de los formatos alternativos de los endpoints masivos
+RESPUESTAS_STREAMING = {
+    200: {
+        "description": (
+            f"Lista JSON (format=rows), objeto columnar por estación (format=columns), o "
+            f"exportación completa por streaming con Accept: {MEDIA_NDJSON} o {MEDIA_CSV}"
+        ),
+        "content": {MEDIA_NDJSON: {}, MEDIA_CSV: {}},
+    }
+}
+
+# Atributo con el nombre de la estación en las vistas que no lo llaman "estacion"
+_ATRIBUTO_ESTACION = {
+    VColiformesFecalesEnMatrizBiologica: "estaciones_poal",
+    VColiformesFecalesEnMatrizAcuosa: "estaciones_poal",
+    VMetalesTotalesEnLaMatrizSedimentaria: "estaciones_poal",
+    VMetalesDisueltosEnLaMatrizAcuosa: "estaciones_poal",
+    VCaudalMedioDeAguasCorrientes: "estaciones_fluviometricas",
+    VCantidadDeAguaCaida: "estaciones_meteorologicas_dmc",
+    VVolumenDelEmbalsePorEmbalse: "embalse",
+    VAlturaNieveEquivalenteEnAgua: "estaciones_nivometricas",
+    VNivelEstaticoDeAguasSubterraneas: "estaciones_pozo",
+}
+
+
+class Paginacion:
+    """Parámetros de paginación por cursor (keyset) para los endpoints masivos"""
+
+    def __init__(
+        self,
+        limit: int = Query(
+            settings.paginacion_limite_defecto, ge=1, le=settings.paginacion_limite_maximo,
+            description=(
+                "Cantidad máxima de registros por página; si hay más, el cursor de la "
+                f"siguiente se informa en el header {HEADER_CURSOR}"
+            )
+        ),
+        cursor: Optional[str] = Query(
+            None,
+            description=f"Cursor opaco de la página siguiente, tomado del header {HEADER_CURSOR}"
+        ),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+class FiltrosVista:
+    """Filtros opcionales de los endpoints masivos, aplicados en el WHERE de la consulta"""
+
+    def __init__(
+        self,
+        estacion: Optional[List[str]] = Query(
+            None, description="Nombre de la estación (se puede repetir para varias)"
+        ),
+        numero_region: Optional[int] = Query(
+            None, description="Número de región de las estaciones (según la vista de estaciones; solo vistas de aire)"
+        ),
+        desde: Optional[str] = Query(None, description="Periodo inicial, inclusive (yyyy, yyyy-mm o yyyy-mm-dd)"),
+        hasta: Optional[str] = Query(None, description="Periodo final, inclusive (yyyy, yyyy-mm o yyyy-mm-dd)"),
+    ):
+        self.estacion = estacion
+        self.numero_region = numero_region
+        self.desde = desde
+        self.hasta = hasta
+
+    def aplicar(self, consulta, modelo: type):
+        columna = columna_estacion(modelo)
+        if self.estacion:
+            consulta = consulta.where(columna.in_(self.estacion))
+        if self.numero_region is not None:
+            if not admite_region(modelo):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"numero_region no aplica a {modelo.__tablename__}: sus registros no usan estaciones de v_estaciones"
+                )
+            consulta = consulta.where(columna.in_(
+                select(Estacion.nombre).where(Estacion.numero_region == self.numero_region)
+            ))
+
+        # Rango sobre la clave numérica del periodo, no sobre el texto
+        if self.desde is not None or self.hasta is not None:
+            clave = clave_periodo(modelo)
+            digitos = digitos_periodo(modelo)
+            if self.desde is not None:
+                consulta = consulta.where(clave >= _clave_limite(self.desde, digitos, final=False))
+            if self.hasta is not None:
+                consulta = consulta.where(clave <= _clave_limite(self.hasta, digitos, final=True))
+        return consulta
+
+
+class ParametrosVista:
+    """Opciones de una consulta masiva: filtros, paginación y formato de salida negociado"""
+
+    def __init__(
+        self,
+        filtros: FiltrosVista = Depends(),
+        paginacion: Paginacion = Depends(),
+        formato: Formato = Query(
+            FORMATO_FILAS, alias="format",
+            description="rows: lista de registros; columns: un arreglo por columna, agrupado por estación"
+        ),
+        accept: Optional[str] = Header(None, include_in_schema=False),
+    ):
+        self.filtros = filtros
+        self.paginacion = paginacion
+        self.formato = formato
+        # El formato pedido explícitamente por query tiene prioridad sobre el Accept
+        self.formato_stream = formato_stream(accept) if formato == FORMATO_FILAS else None
+
+
+def _rangos_accept(accept: str) -> List[tuple]:
+    """Rangos del header Accept como (tipo, subtipo, q); un q mal escrito vale 0"""
+    rangos = []
+    for parte in accept.lower().split(","):
+        media, *parametros = [trozo.strip() for trozo in parte.split(";")]
+        tipo, _, subtipo = media.partition("/")
+        if not tipo or not subtipo:
+            continue
+        q = 1.0
+        for parametro in parametros:
+            nombre, _, valor = parametro.partition("=")
+            if nombre.strip() == "q":
+                try:
+                    q = min(max(float(valor), 0.0), 1.0)
+                except ValueError:
+                    q = 0.0
+        rangos.append((tipo, subtipo, q))
+    return rangos
+
+
+def _calidad(media: str, rangos: List[tuple]) -> tuple:
+    """(q, especificidad) del rango más específico que cubre media: exacto > tipo/* > */*"""
+    tipo, _, subtipo = media.partition("/")
+    mejor = (0.0, -1)
+    for tipo_rango, subtipo_rango, q in rangos:
+        if tipo_rango == tipo and subtipo_rango == subtipo:
+            especificidad = 2
+        elif tipo_rango == tipo and subtipo_rango == "*":
+            especificidad = 1
+        elif tipo_rango == "*" and subtipo_rango == "*":
+            especificidad = 0
+        else:
+            continue
+        if especificidad > mejor[1]:
+            mejor = (q, especificidad)
+    return mejor
+
+
+def formato_stream(accept: Optional[str]) -> Optional[str]:
+    """
+    Formato de streaming (NDJSON o CSV) negociado con el header Accept, o None para JSON.
+
+    Se respetan los q: 'text/csv;q=0' rechaza CSV. Gana el formato con mayor q y, a
+    igual q, el rango más específico; si JSON empata, se responde JSON.
+    """
+    if not accept:
+        return None
+    rangos = _rangos_accept(accept)
+    calidad_json = _calidad("application/json", rangos)
+    elegido, mejor = None, calidad_json
+    for media in (MEDIA_NDJSON, MEDIA_CSV):
+        calidad = _calidad(media, rangos)
+        if calidad[0] > 0 and calidad > mejor:
+            elegido, mejor = media, calidad
+    return elegido
+
+
+def modelo_respuesta(modelo: type, esquema: Type[BaseModel]):
+    """
+    response_model de un endpoint masivo: la lista de registros (format=rows) o el
+    formato columnar {estación: {columna: [valores...]}} (format=columns).
+
+    Solo documenta ambas formas en OpenAPI: listar_vista entrega la respuesta ya serializada.
+    """
+    agrupar_por = atributo_estacion(modelo)
+    columnas = create_model(
+        f"{esquema.__name__.removesuffix('Schema')}ColumnasSchema",
+        __doc__=f"Arreglos por columna de {esquema.__name__} para una estación ({agrupar_por})",
+        **{
+            nombre: (List[campo.annotation], ...)
+            for nombre, campo in esquema.model_fields.items() if nombre != agrupar_por
+        }
+    )
+    return Union[List[esquema], Dict[str, columnas]]
+
+
+def columnas_clave(modelo: type) -> list:
+    """Columnas de la clave primaria en orden de declaración (periodo primero)"""
+    return list(inspect(modelo).primary_key)
+
+
+def atributo_estacion(modelo: type) -> str:
+    """Nombre del atributo con la estación o entidad a la que pertenece cada registro"""
+    return _ATRIBUTO_ESTACION.get(modelo, "estacion")
+
+
+def admite_region(modelo: type) -> bool:
+    """
+    Si la vista se puede filtrar por región: solo las vistas de aire identifican sus
+    registros con nombres de v_estaciones; las de agua usan sus propias entidades
+    (estaciones fluviométricas, embalses, pozos...) que no tienen región asociada.
+    """
+    return modelo.__module__ == models.aire.__name__
+
+
+def columna_estacion(modelo: type):
+    return getattr(modelo, atributo_estacion(modelo))
+
+
+def _clave_limite(valor: str, digitos: int, final: bool) -> int:
+    try:
+        return clave_de_texto(valor, digitos, final)
+    except ValueError:
+        raise HTTPException(
+            status_code=422, detail=f"Periodo inválido: {valor} (use yyyy, yyyy-mm o yyyy-mm-dd con una fecha existente)"
+        )
+
+
+def atributos_clave(modelo: type) -> List[str]:
+    """Nombres de atributo del modelo correspondientes a la clave primaria"""
+    mapper = inspect(modelo)
+    return [mapper.get_property_by_column(columna).key for columna in mapper.primary_key]
+
+
+def codificar_cursor(valores: dict) -> str:
+    """Cursor opaco con los valores de la clave de la última fila, por nombre de atributo"""
+    texto = json.dumps(valores, separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip("=")
+
+
+def _tipo_admitido(valor, tipo: type) -> bool:
+    if isinstance(valor, bool):
+        return False
+    if tipo is float:
+        return isinstance(valor, (int, float))
+    return isinstance(valor, tipo)
+
+
+def decodificar_cursor(cursor: str, modelo: type) -> list:
+    """
+    Valores de la clave (en orden de columnas) contenidos en el cursor.
+
+    El cursor debe traer exactamente los atributos de la clave de la vista, cada uno con
+    el tipo de su columna; en otro caso se responde 400 en lugar de ignorarlo o dejar
+    que la comparación falle en la base de datos.
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except ValueError:
+        valores = None
+
+    mapper = inspect(modelo)
+    tipos = {
+        mapper.get_property_by_column(columna).key: columna.type.python_type
+        for columna in mapper.primary_key
+    }
+    if (
+        not isinstance(valores, dict)
+        or set(valores) != set(tipos)
+        or not all(_tipo_admitido(valores[atributo], tipo) for atributo, tipo in tipos.items())
+    ):
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+    return [valores[atributo] for atributo in tipos]
+
+
+def columnas_vista(modelo: type) -> list:
+    """Columnas de la vista etiquetadas con el nombre de atributo del modelo"""
+    return [
+        propiedad.columns[0].label(propiedad.key)
+        for propiedad in inspect(modelo).column_attrs
+    ]
+
+
+def respuesta_json(nombres: List[str], filas) -> Response:
+    """
+    Serializa filas (tuplas) directamente a JSON con orjson.
+
+    Evita crear objetos ORM y validar cada fila con el schema de respuesta: los schemas
+    de las vistas tienen los mismos campos y tipos que sus modelos, así que el JSON es
+    el mismo que produciría response_model (que se mantiene para la documentación).
+    """
+    return Response(
+        orjson.dumps([dict(zip(nombres, fila)) for fila in filas], default=str),
+        media_type="application/json"
+    )
+
+
+def respuesta_columnas(nombres: List[str], filas, agrupar_por: str) -> Response:
+    """
+    Serializa filas en formato columnar agrupado: {grupo: {columna: [valores...]}}.
+
+    La columna de agrupación no se repite en cada registro, y los gráficos consumen
+    directamente un arreglo por eje. Dentro de cada grupo se conserva el orden de las filas.
+    """
+    posicion = nombres.index(agrupar_por)
+    otras = [i for i in range(len(nombres)) if i != posicion]
+    grupos = {}
+    for fila in filas:
+        columnas = grupos.get(fila[posicion])
+        if columnas is None:
+            columnas = grupos[fila[posicion]] = [[] for _ in otras]
+        for valores, i in zip(columnas, otras):
+            valores.append(fila[i])
+
+    nombres_otras = [nombres[i] for i in otras]
+    return Response(
+        orjson.dumps(
+            {grupo: dict(zip(nombres_otras, columnas)) for grupo, columnas in grupos.items()},
+            default=str, option=orjson.OPT_NON_STR_KEYS
+        ),
+        media_type="application/json"
+    )
+
+
+async def leer_lotes(consulta, tamano_lote: Optional[int] = None):
+    """
+    Recorre la consulta con un cursor del lado del servidor, lote a lote.
+
+    Usa su propia sesión porque el generador se consume después de que el handler
+    retorna, cuando la sesión de la dependencia puede haberse cerrado.
+    """
+    async with AsyncSessionLocal() as db:
+        resultado = await db.stream(
+            consulta.execution_options(yield_per=tamano_lote or settings.streaming_lote)
+        )
+        async for lote in resultado.partitions():
+            yield lote
+
+
+async def _ndjson(consulta, nombres: List[str]):
+    async for lote in leer_lotes(consulta):
+        yield b"".join(
+            orjson.dumps(dict(zip(nombres, fila)), default=str) + b"\n" for fila in lote
+        )
+
+
+async def _csv(consulta, nombres: List[str]):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(nombres)
+    async for lote in leer_lotes(consulta):
+        escritor.writerows(lote)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def consulta_exportacion(modelo: type, filtros: Optional[FiltrosVista] = None):
+    """Columnas de la vista en orden de clave, con los filtros de los endpoints masivos"""
+    consulta = select(*columnas_vista(modelo)).order_by(*columnas_clave(modelo))
+    if filtros is not None:
+        consulta = filtros.aplicar(consulta, modelo)
+    return consulta
+
+
+def exportar_stream(modelo: type, formato: str, filtros: Optional[FiltrosVista] = None) -> StreamingResponse:
+    """Exporta la vista (completa o filtrada) fila a fila sin materializarla en memoria"""
+    consulta = consulta_exportacion(modelo, filtros)
+    nombres = [columna.name for columna in consulta.selected_columns]
+
+    if formato == MEDIA_CSV:
+        return StreamingResponse(
+            _csv(consulta, nombres),
+            media_type=MEDIA_CSV,
+            headers={"Content-Disposition": f'attachment; filename="{modelo.__tablename__}.csv"'}
+        )
+    return StreamingResponse(_ndjson(consulta, nombres), media_type=MEDIA_NDJSON)
+
+
+async def listar_vista(db: AsyncSession, modelo: type, parametros: ParametrosVista) -> Response:
+    """
+    Registros de una vista ordenados por su clave primaria, serializados a JSON.
+
+    Siempre se pagina (limit por defecto según configuración) con keyset: la página
+    siguiente continúa desde la última clave entregada (WHERE (clave) > (cursor)), por lo
+    que el costo y la memoria de cada página no crecen con la vista ni con la posición, y
+    el cursor de la página siguiente se informa en un header. La vista completa se
+    obtiene por streaming (Accept NDJSON/CSV) o recorriendo los cursores.
+
+    Con format=columns se responde un arreglo por columna agrupado por estación. Si el
+    cliente pide NDJSON o CSV en el header Accept, la vista se exporta por streaming en
+    lugar de construir la lista de respuesta. Los filtros se aplican en
+    la base de datos en todos los casos.
+    """
+    if parametros.formato_stream:
+        return exportar_stream(modelo, parametros.formato_stream, parametros.filtros)
+
+    paginacion = parametros.paginacion
+    claves = columnas_clave(modelo)
+    columnas = columnas_vista(modelo)
+    nombres = [columna.name for columna in columnas]
+    consulta = parametros.filtros.aplicar(select(*columnas).order_by(*claves), modelo)
+
+    def serializar(filas) -> Response:
+        if parametros.formato == FORMATO_COLUMNAS:
+            return respuesta_columnas(nombres, filas, atributo_estacion(modelo))
+        return respuesta_json(nombres, filas)
+
+    limite = paginacion.limit
+    if paginacion.cursor:
+        valores = decodificar_cursor(paginacion.cursor, modelo)
+        consulta = consulta.where(tuple_(*claves) > tuple_(*valores))
+
+    filas = (await db.execute(consulta.limit(limite + 1))).all()
+    respuesta = serializar(filas[:limite])
+    if len(filas) > limite:
+        ultima = filas[limite - 1]._mapping
+        respuesta.headers[HEADER_CURSOR] = codificar_cursor(
+            {atributo: ultima[atributo] for atributo in atributos_clave(modelo)}
+        )
+    return respuesta
@@ -1,17 +1,36 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 
 from core.config import settings
 from core.database import Base, engine
+from core.refresco import refrescar_todo, ciclo_refresco
+from middleware.cache import add_cache_middleware
+from middleware.compresion import add_compresion_middleware
 from middleware.cors import add_cors_middleware
+from middleware.etag import add_etag_middleware
 from middleware.security import add_security_middleware
 from routers.public import general
-from routers.private import aire, agua, estaciones, entidades_agua, metricas
+from routers.private import aire, agua, estaciones, entidades_agua, metricas, exportar, busqueda
 
 # Crear tablas si no existen (comentar en producción para mejor performance)
 # Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Carga las estructuras en memoria al iniciar y las refresca en segundo plano"""
+    await refrescar_todo()
+    tarea_refresco = asyncio.create_task(ciclo_refresco())
+    yield
+    tarea_refresco.cancel()
+    # Esperar a que termine: un refresco en curso alcanza a cerrar su sesión antes del apagado
+    with suppress(asyncio.CancelledError):
+        await tarea_refresco
+
 # Crear aplicación FastAPI
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.api_name,
     version=settings.api_version,
     description=settings.api_description,
@@ -26,7 +45,10 @@ app = FastAPI(
     }
 )
 
-# Agregar middleware
+# Agregar middleware (el último agregado es el más externo)
+add_cache_middleware(app)
+add_compresion_middleware(app)
+add_etag_middleware(app)
 add_cors_middleware(app)
 add_security_middleware(app)
 
@@ -62,6 +84,16 @@ app.include_router(
     prefix="/api/private"
 )
 
+app.include_router(
+    exportar.router,
+    prefix="/api/private"
+)
+
+app.include_router(
+    busqueda.router,
+    prefix="/api/private"
+)
+
 # Ruta raíz
 @app.get("/")
 async def root():
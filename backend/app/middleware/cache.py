@@ -0,0 +1,121 @@
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode
+
+from fastapi import FastAPI
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.cache import cache_respuestas, EntradaCache
+from core.compresion import elegir_codificacion
+from core.config import settings
+from core.vistas import formato_stream
+
+# Solo se cachean los datos; la API pública (health, info) debe reflejar el estado actual
+PREFIJO_CACHEABLE = "/api/private/"
+
+HEADER_CACHE = b"x-cache"
+
+# Headers que dependen de la variante enviada y se recalculan en cada respuesta
+_HEADERS_VARIANTE = {b"content-length", b"content-encoding", b"vary", HEADER_CACHE}
+
+
+def clave_cache(scope: Scope) -> str:
+    """Ruta más parámetros de query en orden canónico (el orden en la URL no importa)"""
+    parametros = parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True)
+    return f"{scope['path']}?{urlencode(sorted(parametros))}"
+
+
+class CacheRespuestasMiddleware:
+    """
+    Responde los GET repetidos de /api/private desde el cache de respuestas.
+
+    En un fallo se retiene la respuesta JSON del endpoint hasta tenerla completa, se
+    guarda y se envía por el mismo camino que un acierto. El cuerpo se envía comprimido
+    según el Accept-Encoding del cliente, reutilizando la variante ya guardada.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if not self._cacheable(scope):
+            await self.app(scope, receive, send)
+            return
+
+        clave = clave_cache(scope)
+        codificacion = elegir_codificacion(Headers(scope=scope).get("accept-encoding"))
+        entrada = cache_respuestas.obtener(clave)
+        if entrada is not None:
+            await self._responder(clave, entrada, codificacion, b"HIT", send)
+            return
+
+        inicio: Optional[Message] = None
+        partes = []
+        tamano = 0
+
+        async def enviar(mensaje: Message):
+            nonlocal inicio, partes, tamano
+            if mensaje["type"] == "http.response.start":
+                if self._guardable(mensaje):
+                    inicio = mensaje
+                    return
+            elif mensaje["type"] == "http.response.body" and inicio is not None:
+                partes.append(mensaje.get("body", b""))
+                tamano += len(partes[-1])
+                if not mensaje.get("more_body", False):
+                    entrada = EntradaCache(inicio["status"], self._headers_base(inicio), b"".join(partes))
+                    cache_respuestas.guardar(clave, entrada)
+                    await self._responder(clave, entrada, codificacion, b"MISS", send)
+                    return
+                if tamano <= cache_respuestas.entrada_maxima:
+                    return
+                # Demasiado grande para el cache: se libera lo retenido y se sigue de largo
+                await send(inicio)
+                await send({"type": "http.response.body", "body": b"".join(partes), "more_body": True})
+                inicio, partes = None, []
+                return
+            await send(mensaje)
+
+        await self.app(scope, receive, enviar)
+
+    @staticmethod
+    def _cacheable(scope: Scope) -> bool:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return False
+        if not scope["path"].startswith(PREFIJO_CACHEABLE):
+            return False
+        # Las exportaciones por streaming (NDJSON, CSV) no se cachean: pueden ser enormes.
+        # Se negocia igual que el endpoint, así 'text/csv;q=0' sí se cachea
+        return formato_stream(Headers(scope=scope).get("accept")) is None
+
+    @staticmethod
+    def _guardable(inicio: Message) -> bool:
+        if inicio["status"] != 200:
+            return False
+        headers = dict(inicio.get("headers", []))
+        return (
+            headers.get(b"content-type", b"").startswith(b"application/json")
+            and b"content-encoding" not in headers
+        )
+
+    @staticmethod
+    def _headers_base(inicio: Message) -> list:
+        return [(k, v) for k, v in inicio.get("headers", []) if k.lower() not in _HEADERS_VARIANTE]
+
+    @staticmethod
+    async def _responder(clave: str, entrada: EntradaCache, codificacion: Optional[str], estado: bytes, send: Send):
+        cuerpo = entrada.cuerpo
+        headers = entrada.headers + [(b"vary", b"Accept-Encoding"), (HEADER_CACHE, estado)]
+        if codificacion and len(cuerpo) >= settings.compresion_minimo_bytes:
+            cuerpo = cache_respuestas.variante(clave, entrada, codificacion)
+            headers.append((b"content-encoding", codificacion.encode()))
+        headers.append((b"content-length", str(len(cuerpo)).encode()))
+
+        await send({"type": "http.response.start", "status": entrada.status, "headers": headers})
+        await send({"type": "http.response.body", "body": cuerpo})
+
+
+def add_cache_middleware(app: FastAPI):
+    """Agregar el cache de respuestas (debe quedar dentro de compresión, CORS y seguridad)"""
+    if settings.cache_habilitado:
+        app.add_middleware(CacheRespuestasMiddleware)
@@ -0,0 +1,88 @@
+from typing import Optional
+
+from fastapi import FastAPI
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.compresion import CompresorIncremental, comprimible, comprimir, elegir_codificacion
+from core.config import settings
+
+
+class CompresionMiddleware:
+    """
+    Compresión gzip/brotli de las respuestas que no vienen ya comprimidas.
+
+    Las respuestas de un solo cuerpo se comprimen si superan el tamaño mínimo; las de
+    streaming (NDJSON, CSV) se comprimen por partes a medida que se generan. Las que
+    entrega el cache de respuestas ya traen Content-Encoding y pasan sin cambios.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codificacion = elegir_codificacion(Headers(scope=scope).get("accept-encoding"))
+        if codificacion is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio: Optional[Message] = None
+        compresor: Optional[CompresorIncremental] = None
+        directo = False
+
+        async def enviar(mensaje: Message):
+            nonlocal inicio, compresor, directo
+            if mensaje["type"] == "http.response.start":
+                headers = Headers(raw=mensaje.get("headers", []))
+                if (
+                    "content-encoding" in headers
+                    or not comprimible(headers.get("content-type", "").encode())
+                ):
+                    directo = True
+                    await send(mensaje)
+                else:
+                    # Se decide al ver el primer cuerpo (tamaño o streaming)
+                    inicio = mensaje
+                return
+
+            if mensaje["type"] != "http.response.body" or directo:
+                await send(mensaje)
+                return
+
+            cuerpo = mensaje.get("body", b"")
+            mas = mensaje.get("more_body", False)
+
+            if compresor is None:
+                if not mas and len(cuerpo) < settings.compresion_minimo_bytes:
+                    directo = True
+                    await send(inicio)
+                    await send(mensaje)
+                    return
+                headers = MutableHeaders(raw=list(inicio.get("headers", [])))
+                headers["content-encoding"] = codificacion
+                headers.add_vary_header("Accept-Encoding")
+                if not mas:
+                    cuerpo = comprimir(cuerpo, codificacion)
+                    headers["content-length"] = str(len(cuerpo))
+                    await send({**inicio, "headers": headers.raw})
+                    await send({"type": "http.response.body", "body": cuerpo})
+                    directo = True
+                    return
+                del headers["content-length"]
+                await send({**inicio, "headers": headers.raw})
+                compresor = CompresorIncremental(codificacion)
+
+            datos = compresor.parte(cuerpo) if mas else compresor.parte(cuerpo) + compresor.final()
+            await send({"type": "http.response.body", "body": datos, "more_body": mas})
+
+        await self.app(scope, receive, enviar)
+
+
+def add_compresion_middleware(app: FastAPI):
+    """Agregar compresión gzip/brotli (debe quedar fuera del cache de respuestas)"""
+    if settings.compresion_habilitada:
+        app.add_middleware(CompresionMiddleware)
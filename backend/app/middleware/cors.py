@@ -10,4 +10,5 @@ def add_cors_middleware(app: FastAPI):
         allow_credentials=True,
         allow_methods=settings.allowed_methods,
         allow_headers=settings.allowed_headers,
+        expose_headers=settings.expose_headers,
     )
\ No newline at end of file
@@ -0,0 +1,111 @@
+import hashlib
+from typing import Optional
+
+from fastapi import FastAPI
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.compresion import elegir_codificacion
+from core.version import obtener_version
+from middleware.cache import PREFIJO_CACHEABLE, clave_cache
+
+# Respuestas que incluyen la hora de construcción del índice: no son idénticas entre
+# procesos con la misma versión de datos, así que no pueden tener un ETag fuerte
+_RUTAS_SIN_ETAG = {
+    "/api/private/estaciones/disponibilidad",
+}
+
+# Headers de la solicitud de los que depende el ETag: la 304 y la 200 deben declararlos
+# igual, o un cache compartido podría entregar la variante equivocada
+_VARY = ("Accept", "Accept-Encoding")
+
+
+def _vary(valor: Optional[str]) -> bytes:
+    """Vary con los headers del ETag primero, seguidos de los que ya traía la respuesta"""
+    otros = [
+        nombre.strip() for nombre in (valor or "").split(",")
+        if nombre.strip() and nombre.strip().lower() not in {v.lower() for v in _VARY}
+    ]
+    return ", ".join([*_VARY, *otros]).encode()
+
+
+def etag_solicitud(scope: Scope) -> Optional[bytes]:
+    """
+    ETag fuerte de la respuesta, calculado antes de ejecutar el endpoint.
+
+    Combina la huella del contenido de todas las vistas y catálogos (calculada en cada
+    refresco) con la ruta, los parámetros, el Accept y la codificación negociada (cada
+    variante comprimida es una representación distinta). Sin versión no hay ETag.
+    """
+    version = obtener_version()
+    if version is None:
+        return None
+    headers = Headers(scope=scope)
+    accept = headers.get("accept", "")
+    codificacion = elegir_codificacion(headers.get("accept-encoding")) or "identity"
+    resumen = hashlib.blake2b(
+        f"{version.huella}|{clave_cache(scope)}|{accept}|{codificacion}".encode(), digest_size=16
+    ).hexdigest()
+    return f'"{resumen}"'.encode()
+
+
+def _coincide(if_none_match: str, etag: bytes) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match usa comparación débil: se ignora el prefijo W/
+    candidatos = {valor.strip().removeprefix("W/") for valor in if_none_match.split(",")}
+    return etag.decode() in candidatos
+
+
+class ETagMiddleware:
+    """
+    ETag y solicitudes condicionales para los GET de /api/private.
+
+    Si el If-None-Match del cliente coincide se responde 304 sin ejecutar el endpoint
+    ni consultar la base de datos; en otro caso se agrega el ETag a la respuesta 200.
+    Ambas llevan el mismo Vary.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not scope["path"].startswith(PREFIJO_CACHEABLE)
+            or scope["path"] in _RUTAS_SIN_ETAG
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        etag = etag_solicitud(scope)
+        if etag is None:
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if if_none_match and _coincide(if_none_match, etag):
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [(b"etag", etag), (b"vary", _vary(None))],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def enviar(mensaje: Message):
+            if mensaje["type"] == "http.response.start" and mensaje["status"] == 200:
+                headers = list(mensaje.get("headers", []))
+                vary = _vary(", ".join(Headers(raw=headers).getlist("vary")))
+                mensaje["headers"] = [(k, v) for k, v in headers if k.lower() != b"vary"] + [
+                    (b"etag", etag), (b"vary", vary)
+                ]
+            await send(mensaje)
+
+        await self.app(scope, receive, enviar)
+
+
+def add_etag_middleware(app: FastAPI):
+    """Agregar ETag y respuestas 304 (debe quedar fuera del cache de respuestas)"""
+    app.add_middleware(ETagMiddleware)
@@ -1,10 +1,88 @@
 from fastapi import FastAPI
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+# Content Security Policy (CSP) - Protección contra XSS
+# Para una API REST, no necesitamos script-src ni style-src complejos
+CSP_DIRECTIVES = [
+    "default-src 'self'",
+    "script-src 'self'",
+    "style-src 'self'",
+    # Eliminado wildcard https: - solo permitir 'self' y data URIs
+    "img-src 'self' data:",
+    "font-src 'self' data:",
+    "connect-src 'self'",
+    "frame-src 'none'",
+    "object-src 'none'",
+    "base-uri 'self'",
+    "form-action 'self'",
+    "frame-ancestors 'none'",
+    "upgrade-insecure-requests",
+]
+
+# Permissions-Policy - Controlar features del navegador
+# Política más restrictiva con más features bloqueadas
+PERMISSIONS_POLICY = [
+    "accelerometer=()",
+    "ambient-light-sensor=()",
+    "autoplay=()",
+    "battery=()",
+    "camera=()",
+    "cross-origin-isolated=()",
+    "display-capture=()",
+    "document-domain=()",
+    "encrypted-media=()",
+    "execution-while-not-rendered=()",
+    "execution-while-out-of-viewport=()",
+    "fullscreen=()",
+    "geolocation=()",
+    "gyroscope=()",
+    "keyboard-map=()",
+    "magnetometer=()",
+    "microphone=()",
+    "midi=()",
+    "navigation-override=()",
+    "payment=()",
+    "picture-in-picture=()",
+    "publickey-credentials-get=()",
+    "screen-wake-lock=()",
+    "sync-xhr=()",
+    "usb=()",
+    "web-share=()",
+    "xr-spatial-tracking=()",
+]
+
+SECURITY_HEADERS = {
+    "Content-Security-Policy": "; ".join(CSP_DIRECTIVES),
+    # X-Frame-Options - Protección contra clickjacking
+    "X-Frame-Options": "DENY",
+    # X-Content-Type-Options - Prevenir MIME sniffing
+    "X-Content-Type-Options": "nosniff",
+    "Permissions-Policy": ", ".join(PERMISSIONS_POLICY),
+    # Cross-Origin-Resource-Policy - Protección contra ataques Spectre
+    # Para una API, usar 'cross-origin' para permitir requests desde el frontend
+    "Cross-Origin-Resource-Policy": "cross-origin",
+    # Cross-Origin-Embedder-Policy - Aislamiento entre orígenes
+    # Usar 'unsafe-none' para compatibilidad con CORS
+    "Cross-Origin-Embedder-Policy": "unsafe-none",
+    # Cross-Origin-Opener-Policy - Protección adicional contra Spectre
+    "Cross-Origin-Opener-Policy": "same-origin",
+    # Referrer-Policy - Controlar información del referrer
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    # X-XSS-Protection - Protección legacy contra XSS (compatibilidad)
+    "X-XSS-Protection": "1; mode=block",
+}
+
+# Strict-Transport-Security - Forzar HTTPS (en producción)
+# Este header solo debe enviarse sobre HTTPS
+HSTS_HEADER = ("Strict-Transport-Security", "max-age=31536000; includeSubDomains; preload")
+
+
+def _codificar(headers: list) -> list:
+    return [(nombre.lower().encode("latin-1"), valor.encode("latin-1")) for nombre, valor in headers]
+
+
+class SecurityHeadersMiddleware:
     """
     Middleware para agregar headers HTTP de seguridad
     Corrige vulnerabilidades identificadas en el escaneo OWASP ZAP
@@ -14,95 +92,36 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     - Expandido Permissions-Policy con más restricciones
     - Agregado Cross-Origin-Opener-Policy para protección adicional
     - Mejorado CSP para API REST (sin necesidad de script/style en API)
+
+    Es un middleware ASGI puro: los headers se codifican una sola vez al crear la
+    aplicación y solo se agregan al mensaje de inicio de la respuesta, sin envolver
+    el cuerpo, por lo que no interfiere con las respuestas en streaming.
     """
 
-    async def dispatch(self, request: Request, call_next):
-        response: Response = await call_next(request)
-
-        # Content Security Policy (CSP) - Protección contra XSS
-        # Para una API REST, no necesitamos script-src ni style-src complejos
-        csp_directives = [
-            "default-src 'self'",
-            "script-src 'self'",
-            "style-src 'self'",
-            # Eliminado wildcard https: - solo permitir 'self' y data URIs
-            "img-src 'self' data:",
-            "font-src 'self' data:",
-            "connect-src 'self'",
-            "frame-src 'none'",
-            "object-src 'none'",
-            "base-uri 'self'",
-            "form-action 'self'",
-            "frame-ancestors 'none'",
-            "upgrade-insecure-requests",
-        ]
-        response.headers["Content-Security-Policy"] = "; ".join(csp_directives)
-
-        # X-Frame-Options - Protección contra clickjacking
-        response.headers["X-Frame-Options"] = "DENY"
-
-        # X-Content-Type-Options - Prevenir MIME sniffing
-        response.headers["X-Content-Type-Options"] = "nosniff"
-
-        # Permissions-Policy - Controlar features del navegador
-        # Política más restrictiva con más features bloqueadas
-        permissions_policy = [
-            "accelerometer=()",
-            "ambient-light-sensor=()",
-            "autoplay=()",
-            "battery=()",
-            "camera=()",
-            "cross-origin-isolated=()",
-            "display-capture=()",
-            "document-domain=()",
-            "encrypted-media=()",
-            "execution-while-not-rendered=()",
-            "execution-while-out-of-viewport=()",
-            "fullscreen=()",
-            "geolocation=()",
-            "gyroscope=()",
-            "keyboard-map=()",
-            "magnetometer=()",
-            "microphone=()",
-            "midi=()",
-            "navigation-override=()",
-            "payment=()",
-            "picture-in-picture=()",
-            "publickey-credentials-get=()",
-            "screen-wake-lock=()",
-            "sync-xhr=()",
-            "usb=()",
-            "web-share=()",
-            "xr-spatial-tracking=()",
-        ]
-        response.headers["Permissions-Policy"] = ", ".join(permissions_policy)
-
-        # Cross-Origin-Resource-Policy - Protección contra ataques Spectre
-        # Para una API, usar 'cross-origin' para permitir requests desde el frontend
-        response.headers["Cross-Origin-Resource-Policy"] = "cross-origin"
-
-        # Cross-Origin-Embedder-Policy - Aislamiento entre orígenes
-        # Usar 'unsafe-none' para compatibilidad con CORS
-        response.headers["Cross-Origin-Embedder-Policy"] = "unsafe-none"
-
-        # Cross-Origin-Opener-Policy - Protección adicional contra Spectre
-        response.headers["Cross-Origin-Opener-Policy"] = "same-origin"
-
-        # Referrer-Policy - Controlar información del referrer
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-
-        # Strict-Transport-Security - Forzar HTTPS (en producción)
-        # Este header solo debe enviarse sobre HTTPS
-        # Comentar en desarrollo local sin HTTPS
-        if request.url.scheme == "https":
-            response.headers["Strict-Transport-Security"] = (
-                "max-age=31536000; includeSubDomains; preload"
-            )
-
-        # X-XSS-Protection - Protección legacy contra XSS (compatibilidad)
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-
-        return response
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.headers_http = _codificar(list(SECURITY_HEADERS.items()))
+        self.headers_https = self.headers_http + _codificar([HSTS_HEADER])
+        self.nombres_https = {nombre for nombre, _ in self.headers_https}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        seguridad = self.headers_https if scope.get("scheme") == "https" else self.headers_http
+
+        async def enviar(mensaje: Message):
+            if mensaje["type"] == "http.response.start":
+                # Los valores de seguridad reemplazan a los que haya puesto el endpoint
+                headers = [
+                    (nombre, valor) for nombre, valor in mensaje.get("headers", [])
+                    if nombre.lower() not in self.nombres_https
+                ]
+                mensaje["headers"] = headers + seguridad
+            await send(mensaje)
+
+        await self.app(scope, receive, enviar)
 
 
 def add_security_middleware(app: FastAPI):
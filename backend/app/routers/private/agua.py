@@ -1,9 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import select
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.dependencies import get_db
+from core.dependencies import get_async_db
+from core.vistas import ParametrosVista, listar_vista, modelo_respuesta, RESPUESTAS_STREAMING
 from models.agua import *
 from schemas.agua import *
 
@@ -11,31 +10,31 @@ from schemas.agua import *
 vistas_router = APIRouter(
     prefix="/agua/vistas",
     tags=["Agua - Vistas Generales"],
-    responses={404: {"description": "No encontrado"}}
+    responses={404: {"description": "No encontrado"}, **RESPUESTAS_STREAMING}
 )
 
 contaminantes_router = APIRouter(
     prefix="/agua/contaminantes",
     tags=["Agua - Contaminantes"],
-    responses={404: {"description": "No encontrado"}}
+    responses={404: {"description": "No encontrado"}, **RESPUESTAS_STREAMING}
 )
 
 hidrologia_router = APIRouter(
     prefix="/agua/hidrologia",
     tags=["Agua - Hidrología"],
-    responses={404: {"description": "No encontrado"}}
+    responses={404: {"description": "No encontrado"}, **RESPUESTAS_STREAMING}
 )
 
 meteorologicos_router = APIRouter(
     prefix="/agua/meteorologicos",
     tags=["Agua - Meteorológicos"],
-    responses={404: {"description": "No encontrado"}}
+    responses={404: {"description": "No encontrado"}, **RESPUESTAS_STREAMING}
 )
 
 almacenamiento_router = APIRouter(
     prefix="/agua/almacenamiento",
     tags=["Agua - Almacenamiento"],
-    responses={404: {"description": "No encontrado"}}
+    responses={404: {"description": "No encontrado"}, **RESPUESTAS_STREAMING}
 )
 
 # Router principal para incluir en main.py
@@ -47,11 +46,14 @@ router = APIRouter()
 
 @vistas_router.get(
     "/mar-mensual",
-    response_model=List[MarMensualSchema],
+    response_model=modelo_respuesta(VMarMensual, MarMensualSchema),
     summary="Datos mensuales del océano",
     description="Temperatura superficial y nivel medio del mar en estaciones costeras de Chile."
 )
-async def get_mar_mensual(db: Session = Depends(get_db)):
+async def get_mar_mensual(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene datos mensuales oceanográficos de estaciones costeras.
 
@@ -70,16 +72,18 @@ async def get_mar_mensual(db: Session = Depends(get_db)):
 
     **Fuente:** SHOA (Servicio Hidrográfico y Oceanográfico de la Armada de Chile)
     """
-    data = db.query(VMarMensual).order_by(VMarMensual.mes).all()
-    return data
+    return await listar_vista(db, VMarMensual, parametros)
 
 @vistas_router.get(
     "/glaciares-anual-cuenca",
-    response_model=List[GlaciaresAnualCuencaSchema],
+    response_model=modelo_respuesta(VGlaciaresAnualCuenca, GlaciaresAnualCuencaSchema),
     summary="Datos anuales de glaciares",
     description="Estadísticas de glaciares por cuenca hidrográfica en Chile."
 )
-async def get_glaciares_anual_cuenca(db: Session = Depends(get_db)):
+async def get_glaciares_anual_cuenca(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene estadísticas anuales de glaciares por cuenca hidrográfica.
 
@@ -101,8 +105,7 @@ async def get_glaciares_anual_cuenca(db: Session = Depends(get_db)):
 
     **Fuente:** DGA (Dirección General de Aguas) - Inventario Público de Glaciares
     """
-    data = db.query(VGlaciaresAnualCuenca).order_by(VGlaciaresAnualCuenca.anio).all()
-    return data
+    return await listar_vista(db, VGlaciaresAnualCuenca, parametros)
 
 # ============================
 # ENDPOINTS - CONTAMINANTES DEL AGUA
@@ -110,11 +113,14 @@ async def get_glaciares_anual_cuenca(db: Session = Depends(get_db)):
 
 @contaminantes_router.get(
     "/coliformes-biologica",
-    response_model=List[ColiformesBiologicaSchema],
+    response_model=modelo_respuesta(VColiformesFecalesEnMatrizBiologica, ColiformesBiologicaSchema),
     summary="Coliformes fecales en matriz biológica",
     description="Concentraciones de coliformes fecales en organismos marinos (mejillones, machas, etc.)."
 )
-async def get_coliformes_biologica(db: Session = Depends(get_db)):
+async def get_coliformes_biologica(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene mediciones de coliformes fecales en organismos marinos.
 
@@ -139,16 +145,18 @@ async def get_coliformes_biologica(db: Session = Depends(get_db)):
 
     **Fuente:** Red POAL (Programa de Observación del Ambiente Litoral) - IFOP
     """
-    data = db.query(VColiformesFecalesEnMatrizBiologica).order_by(VColiformesFecalesEnMatrizBiologica.dia).all()
-    return data
+    return await listar_vista(db, VColiformesFecalesEnMatrizBiologica, parametros)
 
 @contaminantes_router.get(
     "/coliformes-acuosa",
-    response_model=List[ColiformesAcuosaSchema],
+    response_model=modelo_respuesta(VColiformesFecalesEnMatrizAcuosa, ColiformesAcuosaSchema),
     summary="Coliformes fecales en agua de mar",
     description="Concentraciones de coliformes fecales en agua marina costera."
 )
-async def get_coliformes_acuosa(db: Session = Depends(get_db)):
+async def get_coliformes_acuosa(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene mediciones de coliformes fecales en agua de mar.
 
@@ -167,16 +175,18 @@ async def get_coliformes_acuosa(db: Session = Depends(get_db)):
 
     **Fuente:** Red POAL - IFOP
     """
-    data = db.query(VColiformesFecalesEnMatrizAcuosa).order_by(VColiformesFecalesEnMatrizAcuosa.dia).all()
-    return data
+    return await listar_vista(db, VColiformesFecalesEnMatrizAcuosa, parametros)
 
 @contaminantes_router.get(
     "/metales-sedimentaria",
-    response_model=List[MetalesSedimentariaSchema],
+    response_model=modelo_respuesta(VMetalesTotalesEnLaMatrizSedimentaria, MetalesSedimentariaSchema),
     summary="Metales pesados en sedimentos marinos",
     description="Concentraciones de metales totales en sedimentos costeros."
 )
-async def get_metales_sedimentaria(db: Session = Depends(get_db)):
+async def get_metales_sedimentaria(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene concentraciones de metales pesados en sedimentos marinos.
 
@@ -201,16 +211,18 @@ async def get_metales_sedimentaria(db: Session = Depends(get_db)):
 
     **Fuente:** Red POAL - IFOP
     """
-    data = db.query(VMetalesTotalesEnLaMatrizSedimentaria).order_by(VMetalesTotalesEnLaMatrizSedimentaria.dia).all()
-    return data
+    return await listar_vista(db, VMetalesTotalesEnLaMatrizSedimentaria, parametros)
 
 @contaminantes_router.get(
     "/metales-acuosa",
-    response_model=List[MetalesAcuosaSchema],
+    response_model=modelo_respuesta(VMetalesDisueltosEnLaMatrizAcuosa, MetalesAcuosaSchema),
     summary="Metales pesados disueltos en agua",
     description="Concentraciones de metales disueltos en agua marina costera."
 )
-async def get_metales_acuosa(db: Session = Depends(get_db)):
+async def get_metales_acuosa(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene concentraciones de metales pesados disueltos en agua de mar.
 
@@ -231,8 +243,7 @@ async def get_metales_acuosa(db: Session = Depends(get_db)):
 
     **Fuente:** Red POAL - IFOP
     """
-    data = db.query(VMetalesDisueltosEnLaMatrizAcuosa).order_by(VMetalesDisueltosEnLaMatrizAcuosa.dia).all()
-    return data
+    return await listar_vista(db, VMetalesDisueltosEnLaMatrizAcuosa, parametros)
 
 # ============================
 # ENDPOINTS - HIDROLOGÍA
@@ -240,11 +251,14 @@ async def get_metales_acuosa(db: Session = Depends(get_db)):
 
 @hidrologia_router.get(
     "/caudal",
-    response_model=List[CaudalSchema],
+    response_model=modelo_respuesta(VCaudalMedioDeAguasCorrientes, CaudalSchema),
     summary="Caudal de ríos",
     description="Caudal medio mensual en estaciones fluviométricas de Chile."
 )
-async def get_caudal(db: Session = Depends(get_db)):
+async def get_caudal(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene mediciones de caudal medio mensual en ríos y esteros de Chile.
 
@@ -273,16 +287,18 @@ async def get_caudal(db: Session = Depends(get_db)):
 
     **Fuente:** DGA (Dirección General de Aguas) - Red Hidrométrica Nacional
     """
-    data = db.query(VCaudalMedioDeAguasCorrientes).order_by(VCaudalMedioDeAguasCorrientes.mes).all()
-    return data
+    return await listar_vista(db, VCaudalMedioDeAguasCorrientes, parametros)
 
 @hidrologia_router.get(
     "/pozos",
-    response_model=List[PozoSchema],
+    response_model=modelo_respuesta(VNivelEstaticoDeAguasSubterraneas, PozoSchema),
     summary="Nivel de aguas subterráneas",
     description="Nivel estático de aguas subterráneas en pozos de monitoreo."
 )
-async def get_pozos(db: Session = Depends(get_db)):
+async def get_pozos(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene mediciones del nivel estático de aguas subterráneas.
 
@@ -309,8 +325,7 @@ async def get_pozos(db: Session = Depends(get_db)):
 
     **Fuente:** DGA - Red de Monitoreo de Aguas Subterráneas
     """
-    data = db.query(VNivelEstaticoDeAguasSubterraneas).order_by(VNivelEstaticoDeAguasSubterraneas.dia).all()
-    return data
+    return await listar_vista(db, VNivelEstaticoDeAguasSubterraneas, parametros)
 
 # ============================
 # ENDPOINTS - METEOROLÓGICOS HÍDRICOS
@@ -318,11 +333,14 @@ async def get_pozos(db: Session = Depends(get_db)):
 
 @meteorologicos_router.get(
     "/lluvia",
-    response_model=List[LluviaSchema],
+    response_model=modelo_respuesta(VCantidadDeAguaCaida, LluviaSchema),
     summary="Precipitaciones",
     description="Precipitación mensual acumulada en estaciones meteorológicas."
 )
-async def get_lluvia(db: Session = Depends(get_db)):
+async def get_lluvia(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene datos de precipitación mensual acumulada.
 
@@ -349,16 +367,18 @@ async def get_lluvia(db: Session = Depends(get_db)):
 
     **Fuente:** DMC (Dirección Meteorológica de Chile)
     """
-    data = db.query(VCantidadDeAguaCaida).order_by(VCantidadDeAguaCaida.mes).all()
-    return data
+    return await listar_vista(db, VCantidadDeAguaCaida, parametros)
 
 @meteorologicos_router.get(
     "/evaporacion",
-    response_model=List[EvaporacionSchema],
+    response_model=modelo_respuesta(VEvaporacionRealPorEstacion, EvaporacionSchema),
     summary="Evaporación real",
     description="Evaporación real mensual en estaciones meteorológicas."
 )
-async def get_evaporacion(db: Session = Depends(get_db)):
+async def get_evaporacion(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene datos de evaporación real mensual.
 
@@ -389,16 +409,18 @@ async def get_evaporacion(db: Session = Depends(get_db)):
 
     **Fuente:** DGA / DMC
     """
-    data = db.query(VEvaporacionRealPorEstacion).order_by(VEvaporacionRealPorEstacion.mes).all()
-    return data
+    return await listar_vista(db, VEvaporacionRealPorEstacion, parametros)
 
 @meteorologicos_router.get(
     "/nieve",
-    response_model=List[NieveSchema],
+    response_model=modelo_respuesta(VAlturaNieveEquivalenteEnAgua, NieveSchema),
     summary="Nieve acumulada",
     description="Altura de nieve equivalente en agua en estaciones nivométricas."
 )
-async def get_nieve(db: Session = Depends(get_db)):
+async def get_nieve(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene mediciones de altura de nieve expresada como equivalente en agua.
 
@@ -432,8 +454,7 @@ async def get_nieve(db: Session = Depends(get_db)):
 
     **Fuente:** DGA - Red Nivométrica Nacional
     """
-    data = db.query(VAlturaNieveEquivalenteEnAgua).order_by(VAlturaNieveEquivalenteEnAgua.dia).all()
-    return data
+    return await listar_vista(db, VAlturaNieveEquivalenteEnAgua, parametros)
 
 # ============================
 # ENDPOINTS - ALMACENAMIENTO DE AGUA
@@ -441,11 +462,14 @@ async def get_nieve(db: Session = Depends(get_db)):
 
 @almacenamiento_router.get(
     "/embalses",
-    response_model=List[EmbalseSchema],
+    response_model=modelo_respuesta(VVolumenDelEmbalsePorEmbalse, EmbalseSchema),
     summary="Volumen de embalses",
     description="Volumen mensual almacenado en embalses y lagos artificiales de Chile."
 )
-async def get_embalses(db: Session = Depends(get_db)):
+async def get_embalses(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene datos mensuales de volumen almacenado en embalses.
 
@@ -482,8 +506,7 @@ async def get_embalses(db: Session = Depends(get_db)):
 
     **Fuente:** DGA - Monitoreo de Embalses
     """
-    data = db.query(VVolumenDelEmbalsePorEmbalse).order_by(VVolumenDelEmbalsePorEmbalse.mes).all()
-    return data
+    return await listar_vista(db, VVolumenDelEmbalsePorEmbalse, parametros)
 
 # Incluir sub-routers en el router principal
 router.include_router(vistas_router)
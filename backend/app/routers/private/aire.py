@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.dependencies import get_db
+from core.dependencies import get_async_db
+from core.vistas import ParametrosVista, listar_vista, modelo_respuesta, RESPUESTAS_STREAMING
 from models.aire import *
 from schemas.aire import *
 
@@ -10,61 +10,61 @@ from schemas.aire import *
 general_router = APIRouter(
     prefix="/aire/climaticos",
     tags=["Aire - Climáticos"],
-    responses={404: {"description": "No encontrado"}}
+    responses={404: {"description": "No encontrado"}, **RESPUESTAS_STREAMING}
 )
 
 mp25_router = APIRouter(
     prefix="/aire/mp25",
     tags=["Aire - MP2.5"],
-    responses={404: {"description": "No encontrado"}}
+    responses={404: {"description": "No encontrado"}, **RESPUESTAS_STREAMING}
 )
 
 mp10_router = APIRouter(
     prefix="/aire/mp10",
     tags=["Aire - MP10"],
-    responses={404: {"description": "No encontrado"}}
+    responses={404: {"description": "No encontrado"}, **RESPUESTAS_STREAMING}
 )
 
 o3_router = APIRouter(
     prefix="/aire/o3",
     tags=["Aire - Ozono (O3)"],
-    responses={404: {"description": "No encontrado"}}
+    responses={404: {"description": "No encontrado"}, **RESPUESTAS_STREAMING}
 )
 
 so2_router = APIRouter(
     prefix="/aire/so2",
     tags=["Aire - Dióxido de Azufre (SO2)"],
-    responses={404: {"description": "No encontrado"}}
+    responses={404: {"description": "No encontrado"}, **RESPUESTAS_STREAMING}
 )
 
 no2_router = APIRouter(
     prefix="/aire/no2",
     tags=["Aire - Dióxido de Nitrógeno (NO2)"],
-    responses={404: {"description": "No encontrado"}}
+    responses={404: {"description": "No encontrado"}, **RESPUESTAS_STREAMING}
 )
 
 co_router = APIRouter(
     prefix="/aire/co",
     tags=["Aire - Monóxido de Carbono (CO)"],
-    responses={404: {"description": "No encontrado"}}
+    responses={404: {"description": "No encontrado"}, **RESPUESTAS_STREAMING}
 )
 
 no_router = APIRouter(
     prefix="/aire/no",
     tags=["Aire - Óxido de Nitrógeno (NO)"],
-    responses={404: {"description": "No encontrado"}}
+    responses={404: {"description": "No encontrado"}, **RESPUESTAS_STREAMING}
 )
 
 nox_router = APIRouter(
     prefix="/aire/nox",
     tags=["Aire - Óxidos de Nitrógeno (NOx)"],
-    responses={404: {"description": "No encontrado"}}
+    responses={404: {"description": "No encontrado"}, **RESPUESTAS_STREAMING}
 )
 
 eventos_router = APIRouter(
     prefix="/aire/eventos",
     tags=["Aire - Eventos Climáticos"],
-    responses={404: {"description": "No encontrado"}}
+    responses={404: {"description": "No encontrado"}, **RESPUESTAS_STREAMING}
 )
 
 # Router principal para incluir en main.py
@@ -76,11 +76,14 @@ router = APIRouter()
 
 @general_router.get(
     "/temperatura",
-    response_model=List[TemperaturaSchema],
+    response_model=modelo_respuesta(VTemperatura, TemperaturaSchema),
     summary="Obtener datos de temperatura",
     description="Retorna todas las mediciones de temperatura registradas en las estaciones meteorológicas de Chile."
 )
-async def get_temperatura(db: Session = Depends(get_db)):
+async def get_temperatura(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene datos mensuales de temperatura por estación meteorológica.
 
@@ -95,16 +98,18 @@ async def get_temperatura(db: Session = Depends(get_db)):
 
     **Fuente:** Estaciones meteorológicas DMC (Dirección Meteorológica de Chile)
     """
-    data = db.query(VTemperatura).order_by(VTemperatura.mes).all()
-    return data
+    return await listar_vista(db, VTemperatura, parametros)
 
 @general_router.get(
     "/humedad-radiacion-uv",
-    response_model=List[HumedadRadiacionUVSchema],
+    response_model=modelo_respuesta(VHumedadRadiacionUV, HumedadRadiacionUVSchema),
     summary="Obtener datos de humedad y radiación",
     description="Retorna datos de humedad relativa, radiación global y radiación UVB por estación."
 )
-async def get_humedad_radiacion_uv(db: Session = Depends(get_db)):
+async def get_humedad_radiacion_uv(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene datos mensuales de humedad relativa y radiación solar.
 
@@ -119,8 +124,7 @@ async def get_humedad_radiacion_uv(db: Session = Depends(get_db)):
 
     **Nota:** La radiación UVB es importante para evaluar la exposición solar y riesgos para la salud.
     """
-    data = db.query(VHumedadRadiacionUV).order_by(VHumedadRadiacionUV.mes).all()
-    return data
+    return await listar_vista(db, VHumedadRadiacionUV, parametros)
 
 # ============================
 # ENDPOINTS - MP2.5 (Material Particulado Fino)
@@ -128,11 +132,14 @@ async def get_humedad_radiacion_uv(db: Session = Depends(get_db)):
 
 @mp25_router.get(
     "/anual",
-    response_model=List[Mp25AnualSchema],
+    response_model=modelo_respuesta(VMp25Anual, Mp25AnualSchema),
     summary="Concentraciones anuales de MP2.5",
     description="Estadísticas anuales de Material Particulado fino (MP2.5) por estación de monitoreo."
 )
-async def get_mp25_anual(db: Session = Depends(get_db)):
+async def get_mp25_anual(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene estadísticas anuales de concentraciones de MP2.5.
 
@@ -150,16 +157,18 @@ async def get_mp25_anual(db: Session = Depends(get_db)):
 
     **Fuente:** Red de Monitoreo de Calidad del Aire SINCA (Sistema de Información Nacional de Calidad del Aire)
     """
-    data = db.query(VMp25Anual).order_by(VMp25Anual.anio).all()
-    return data
+    return await listar_vista(db, VMp25Anual, parametros)
 
 @mp25_router.get(
     "/mensual",
-    response_model=List[Mp25MensualSchema],
+    response_model=modelo_respuesta(VMp25Mensual, Mp25MensualSchema),
     summary="Concentraciones mensuales de MP2.5",
     description="Promedios mensuales de Material Particulado fino (MP2.5) por estación."
 )
-async def get_mp25_mensual(db: Session = Depends(get_db)):
+async def get_mp25_mensual(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene promedios mensuales de concentraciones de MP2.5.
 
@@ -172,8 +181,7 @@ async def get_mp25_mensual(db: Session = Depends(get_db)):
 
     **Fuente:** Red SINCA
     """
-    data = db.query(VMp25Mensual).order_by(VMp25Mensual.mes).all()
-    return data
+    return await listar_vista(db, VMp25Mensual, parametros)
 
 # ============================
 # ENDPOINTS - MP10 (Material Particulado Respirable)
@@ -181,11 +189,14 @@ async def get_mp25_mensual(db: Session = Depends(get_db)):
 
 @mp10_router.get(
     "/anual",
-    response_model=List[Mp10AnualSchema],
+    response_model=modelo_respuesta(VMp10Anual, Mp10AnualSchema),
     summary="Concentraciones anuales de MP10",
     description="Estadísticas anuales de Material Particulado respirable (MP10) por estación de monitoreo."
 )
-async def get_mp10_anual(db: Session = Depends(get_db)):
+async def get_mp10_anual(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene estadísticas anuales de concentraciones de MP10.
 
@@ -203,16 +214,18 @@ async def get_mp10_anual(db: Session = Depends(get_db)):
 
     **Fuente:** Red SINCA
     """
-    data = db.query(VMp10Anual).order_by(VMp10Anual.anio).all()
-    return data
+    return await listar_vista(db, VMp10Anual, parametros)
 
 @mp10_router.get(
     "/mensual",
-    response_model=List[Mp10MensualSchema],
+    response_model=modelo_respuesta(VMp10Mensual, Mp10MensualSchema),
     summary="Concentraciones mensuales de MP10",
     description="Promedios mensuales de Material Particulado respirable (MP10) por estación."
 )
-async def get_mp10_mensual(db: Session = Depends(get_db)):
+async def get_mp10_mensual(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene promedios mensuales de concentraciones de MP10.
 
@@ -223,8 +236,7 @@ async def get_mp10_mensual(db: Session = Depends(get_db)):
 
     **Fuente:** Red SINCA
     """
-    data = db.query(VMp10Mensual).order_by(VMp10Mensual.mes).all()
-    return data
+    return await listar_vista(db, VMp10Mensual, parametros)
 
 # ============================
 # ENDPOINTS - O3 (Ozono Troposférico)
@@ -232,11 +244,14 @@ async def get_mp10_mensual(db: Session = Depends(get_db)):
 
 @o3_router.get(
     "/anual",
-    response_model=List[O3AnualSchema],
+    response_model=modelo_respuesta(VO3Anual, O3AnualSchema),
     summary="Concentraciones anuales de Ozono",
     description="Estadísticas anuales de Ozono troposférico (O3) por estación de monitoreo."
 )
-async def get_o3_anual(db: Session = Depends(get_db)):
+async def get_o3_anual(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene estadísticas anuales de concentraciones de O3 troposférico.
 
@@ -256,16 +271,18 @@ async def get_o3_anual(db: Session = Depends(get_db)):
 
     **Fuente:** Red SINCA
     """
-    data = db.query(VO3Anual).order_by(VO3Anual.anio).all()
-    return data
+    return await listar_vista(db, VO3Anual, parametros)
 
 @o3_router.get(
     "/mensual",
-    response_model=List[O3MensualSchema],
+    response_model=modelo_respuesta(VO3Mensual, O3MensualSchema),
     summary="Concentraciones mensuales de Ozono",
     description="Promedios mensuales de Ozono troposférico (O3) por estación."
 )
-async def get_o3_mensual(db: Session = Depends(get_db)):
+async def get_o3_mensual(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene promedios mensuales de concentraciones de O3.
 
@@ -278,8 +295,7 @@ async def get_o3_mensual(db: Session = Depends(get_db)):
 
     **Fuente:** Red SINCA
     """
-    data = db.query(VO3Mensual).order_by(VO3Mensual.mes).all()
-    return data
+    return await listar_vista(db, VO3Mensual, parametros)
 
 # ============================
 # ENDPOINTS - SO2 (Dióxido de Azufre)
@@ -287,11 +303,14 @@ async def get_o3_mensual(db: Session = Depends(get_db)):
 
 @so2_router.get(
     "/anual",
-    response_model=List[So2AnualSchema],
+    response_model=modelo_respuesta(VSo2Anual, So2AnualSchema),
     summary="Concentraciones anuales de SO2",
     description="Estadísticas anuales de Dióxido de Azufre (SO2) por estación de monitoreo."
 )
-async def get_so2_anual(db: Session = Depends(get_db)):
+async def get_so2_anual(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene estadísticas anuales de concentraciones de SO2.
 
@@ -311,16 +330,18 @@ async def get_so2_anual(db: Session = Depends(get_db)):
 
     **Fuente:** Red SINCA
     """
-    data = db.query(VSo2Anual).order_by(VSo2Anual.anio).all()
-    return data
+    return await listar_vista(db, VSo2Anual, parametros)
 
 @so2_router.get(
     "/mensual",
-    response_model=List[So2MensualSchema],
+    response_model=modelo_respuesta(VSo2Mensual, So2MensualSchema),
     summary="Concentraciones mensuales de SO2",
     description="Promedios mensuales de Dióxido de Azufre (SO2) por estación."
 )
-async def get_so2_mensual(db: Session = Depends(get_db)):
+async def get_so2_mensual(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene promedios mensuales de concentraciones de SO2.
 
@@ -331,8 +352,7 @@ async def get_so2_mensual(db: Session = Depends(get_db)):
 
     **Fuente:** Red SINCA
     """
-    data = db.query(VSo2Mensual).order_by(VSo2Mensual.mes).all()
-    return data
+    return await listar_vista(db, VSo2Mensual, parametros)
 
 # ============================
 # ENDPOINTS - NO2 (Dióxido de Nitrógeno)
@@ -340,11 +360,14 @@ async def get_so2_mensual(db: Session = Depends(get_db)):
 
 @no2_router.get(
     "/anual",
-    response_model=List[No2AnualSchema],
+    response_model=modelo_respuesta(VNo2Anual, No2AnualSchema),
     summary="Concentraciones anuales de NO2",
     description="Estadísticas anuales de Dióxido de Nitrógeno (NO2) por estación de monitoreo."
 )
-async def get_no2_anual(db: Session = Depends(get_db)):
+async def get_no2_anual(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene estadísticas anuales de concentraciones de NO2.
 
@@ -365,16 +388,18 @@ async def get_no2_anual(db: Session = Depends(get_db)):
 
     **Fuente:** Red SINCA
     """
-    data = db.query(VNo2Anual).order_by(VNo2Anual.anio).all()
-    return data
+    return await listar_vista(db, VNo2Anual, parametros)
 
 @no2_router.get(
     "/mensual",
-    response_model=List[No2MensualSchema],
+    response_model=modelo_respuesta(VNo2Mensual, No2MensualSchema),
     summary="Concentraciones mensuales de NO2",
     description="Promedios mensuales de Dióxido de Nitrógeno (NO2) por estación."
 )
-async def get_no2_mensual(db: Session = Depends(get_db)):
+async def get_no2_mensual(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene promedios mensuales de concentraciones de NO2.
 
@@ -385,8 +410,7 @@ async def get_no2_mensual(db: Session = Depends(get_db)):
 
     **Fuente:** Red SINCA
     """
-    data = db.query(VNo2Mensual).order_by(VNo2Mensual.mes).all()
-    return data
+    return await listar_vista(db, VNo2Mensual, parametros)
 
 # ============================
 # ENDPOINTS - CO (Monóxido de Carbono)
@@ -394,11 +418,14 @@ async def get_no2_mensual(db: Session = Depends(get_db)):
 
 @co_router.get(
     "/anual",
-    response_model=List[CoAnualSchema],
+    response_model=modelo_respuesta(VCoAnual, CoAnualSchema),
     summary="Concentraciones anuales de CO",
     description="Estadísticas anuales de Monóxido de Carbono (CO) por estación de monitoreo."
 )
-async def get_co_anual(db: Session = Depends(get_db)):
+async def get_co_anual(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene estadísticas anuales de concentraciones de CO.
 
@@ -419,16 +446,18 @@ async def get_co_anual(db: Session = Depends(get_db)):
 
     **Fuente:** Red SINCA
     """
-    data = db.query(VCoAnual).order_by(VCoAnual.anio).all()
-    return data
+    return await listar_vista(db, VCoAnual, parametros)
 
 @co_router.get(
     "/mensual",
-    response_model=List[CoMensualSchema],
+    response_model=modelo_respuesta(VCoMensual, CoMensualSchema),
     summary="Concentraciones mensuales de CO",
     description="Promedios mensuales de Monóxido de Carbono (CO) por estación."
 )
-async def get_co_mensual(db: Session = Depends(get_db)):
+async def get_co_mensual(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene promedios mensuales de concentraciones de CO.
 
@@ -439,8 +468,7 @@ async def get_co_mensual(db: Session = Depends(get_db)):
 
     **Fuente:** Red SINCA
     """
-    data = db.query(VCoMensual).order_by(VCoMensual.mes).all()
-    return data
+    return await listar_vista(db, VCoMensual, parametros)
 
 # ============================
 # ENDPOINTS - NO (Óxido de Nitrógeno)
@@ -448,11 +476,14 @@ async def get_co_mensual(db: Session = Depends(get_db)):
 
 @no_router.get(
     "/anual",
-    response_model=List[NoAnualSchema],
+    response_model=modelo_respuesta(VNoAnual, NoAnualSchema),
     summary="Concentraciones anuales de NO",
     description="Estadísticas anuales de Óxido de Nitrógeno (NO) por estación de monitoreo."
 )
-async def get_no_anual(db: Session = Depends(get_db)):
+async def get_no_anual(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene estadísticas anuales de concentraciones de NO.
 
@@ -468,16 +499,18 @@ async def get_no_anual(db: Session = Depends(get_db)):
 
     **Fuente:** Red SINCA
     """
-    data = db.query(VNoAnual).order_by(VNoAnual.anio).all()
-    return data
+    return await listar_vista(db, VNoAnual, parametros)
 
 @no_router.get(
     "/mensual",
-    response_model=List[NoMensualSchema],
+    response_model=modelo_respuesta(VNoMensual, NoMensualSchema),
     summary="Concentraciones mensuales de NO",
     description="Promedios mensuales de Óxido de Nitrógeno (NO) por estación."
 )
-async def get_no_mensual(db: Session = Depends(get_db)):
+async def get_no_mensual(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene promedios mensuales de concentraciones de NO.
 
@@ -488,8 +521,7 @@ async def get_no_mensual(db: Session = Depends(get_db)):
 
     **Fuente:** Red SINCA
     """
-    data = db.query(VNoMensual).order_by(VNoMensual.mes).all()
-    return data
+    return await listar_vista(db, VNoMensual, parametros)
 
 # ============================
 # ENDPOINTS - NOx (Óxidos de Nitrógeno)
@@ -497,11 +529,14 @@ async def get_no_mensual(db: Session = Depends(get_db)):
 
 @nox_router.get(
     "/anual",
-    response_model=List[NoxAnualSchema],
+    response_model=modelo_respuesta(VNoxAnual, NoxAnualSchema),
     summary="Concentraciones anuales de NOx",
     description="Estadísticas anuales de Óxidos de Nitrógeno (NOx = NO + NO2) por estación de monitoreo."
 )
-async def get_nox_anual(db: Session = Depends(get_db)):
+async def get_nox_anual(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene estadísticas anuales de concentraciones de NOx.
 
@@ -518,16 +553,18 @@ async def get_nox_anual(db: Session = Depends(get_db)):
 
     **Fuente:** Red SINCA
     """
-    data = db.query(VNoxAnual).order_by(VNoxAnual.anio).all()
-    return data
+    return await listar_vista(db, VNoxAnual, parametros)
 
 @nox_router.get(
     "/mensual",
-    response_model=List[NoxMensualSchema],
+    response_model=modelo_respuesta(VNoxMensual, NoxMensualSchema),
     summary="Concentraciones mensuales de NOx",
     description="Promedios mensuales de Óxidos de Nitrógeno (NOx) por estación."
 )
-async def get_nox_mensual(db: Session = Depends(get_db)):
+async def get_nox_mensual(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene promedios mensuales de concentraciones de NOx.
 
@@ -538,8 +575,7 @@ async def get_nox_mensual(db: Session = Depends(get_db)):
 
     **Fuente:** Red SINCA
     """
-    data = db.query(VNoxMensual).order_by(VNoxMensual.mes).all()
-    return data
+    return await listar_vista(db, VNoxMensual, parametros)
 
 # ============================
 # ENDPOINTS - EVENTOS CLIMÁTICOS
@@ -547,11 +583,14 @@ async def get_nox_mensual(db: Session = Depends(get_db)):
 
 @eventos_router.get(
     "/olas-calor",
-    response_model=List[OlasCalorSchema],
+    response_model=modelo_respuesta(VNumEventosDeOlasDeCalor, OlasCalorSchema),
     summary="Eventos de olas de calor",
     description="Número de eventos de olas de calor registrados por región y año."
 )
-async def get_olas_calor(db: Session = Depends(get_db)):
+async def get_olas_calor(
+    db: AsyncSession = Depends(get_async_db),
+    parametros: ParametrosVista = Depends()
+):
     """
     Obtiene el número de eventos de olas de calor por región y año.
 
@@ -571,8 +610,7 @@ async def get_olas_calor(db: Session = Depends(get_db)):
 
     **Fuente:** DMC (Dirección Meteorológica de Chile)
     """
-    data = db.query(VNumEventosDeOlasDeCalor).order_by(VNumEventosDeOlasDeCalor.mes).all()
-    return data
+    return await listar_vista(db, VNumEventosDeOlasDeCalor, parametros)
 
 # Incluir sub-routers en el router principal
 router.include_router(general_router)
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Query
+from typing import List, Literal, Optional
+
+from core.busqueda import obtener_indice_busqueda
+from core.config import settings
+from core.refresco import estructura_vigente
+from schemas.busqueda import SugerenciaSchema
+
+router = APIRouter(
+    prefix="/busqueda",
+    tags=["Búsqueda"],
+    responses={404: {"description": "No encontrado"}}
+)
+
+
+@router.get("/sugerencias", response_model=List[SugerenciaSchema])
+async def get_sugerencias(
+    q: str = Query(..., min_length=1, max_length=100, description="Texto escrito por el usuario"),
+    limit: int = Query(10, ge=1, le=settings.busqueda_max_resultados, description="Cantidad de sugerencias"),
+    fuente: Optional[Literal["estacion", "entidad_agua"]] = Query(None, description="Limitar a estaciones o a entidades de agua")
+):
+    """
+    Autocompletado de estaciones y entidades de agua.
+
+    No distingue mayúsculas ni tildes ('nunoa' encuentra 'Ñuñoa'). Devuelve primero los
+    nombres que empiezan con el texto (o que tienen una palabra que empieza con él) y
+    luego nombres parecidos, para tolerar errores de tipeo.
+    """
+    indice = await estructura_vigente(obtener_indice_busqueda, "El índice de búsqueda")
+    return [
+        {
+            "nombre": documento.nombre,
+            "fuente": documento.fuente,
+            "numero_region": documento.numero_region,
+            "nombre_region": documento.nombre_region,
+            "tipos": list(documento.tipos),
+            "coincidencia": coincidencia,
+            "puntaje": puntaje,
+        }
+        for documento, coincidencia, puntaje in indice.buscar(q, limit, fuente)
+    ]
@@ -1,10 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, inspect, literal
 from typing import List, Optional, Dict, Any
 
-from core.dependencies import get_db
-from models.entidades_agua import EntidadAgua
+from core.catalogos import obtener_catalogos, refrescar_catalogos
+from core.dependencies import get_async_db
+from core.muestreo import reducir_filas
+from core.periodos import clave_periodo
+from core.remuestreo import Frecuencia, Reductor, consulta_remuestreo, puntos_remuestreo
+from core.vistas import columnas_vista, respuesta_json
 from schemas.entidades_agua import EntidadAguaSchema
+from schemas.estaciones import RemuestreoSchema
 
 # Importar todos los modelos de agua
 from models.agua import (
@@ -137,7 +143,7 @@ TIPOS_SUBMETRICAS_DINAMICAS = [
 ]
 
 @router.get("/", response_model=List[EntidadAguaSchema])
-async def get_all_entidades_agua(db: Session = Depends(get_db)):
+async def get_all_entidades_agua(db: AsyncSession = Depends(get_async_db)):
     """
     Obtener todas las entidades de agua registradas en el sistema.
 
@@ -159,13 +165,13 @@ async def get_all_entidades_agua(db: Session = Depends(get_db)):
             }
         ]
     """
-    entidades = db.query(EntidadAgua).order_by(EntidadAgua.tipo, EntidadAgua.nombre).all()
-    return entidades
+    catalogos = obtener_catalogos() or await refrescar_catalogos(db)
+    return catalogos.entidades_agua
 
 @router.get("/tipo/{tipo}", response_model=List[EntidadAguaSchema])
 async def get_entidades_by_tipo(
     tipo: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Obtener entidades de agua filtradas por tipo específico.
@@ -206,9 +212,8 @@ async def get_entidades_by_tipo(
             }
         ]
     """
-    entidades = db.query(EntidadAgua).filter(
-        EntidadAgua.tipo == tipo
-    ).order_by(EntidadAgua.nombre).all()
+    catalogos = obtener_catalogos() or await refrescar_catalogos(db)
+    entidades = catalogos.entidades_tipo(tipo)
 
     if not entidades:
         raise HTTPException(
@@ -219,7 +224,7 @@ async def get_entidades_by_tipo(
     return entidades
 
 @router.get("/tipos", response_model=List[str])
-async def get_tipos_disponibles(db: Session = Depends(get_db)):
+async def get_tipos_disponibles(db: AsyncSession = Depends(get_async_db)):
     """
     Obtener catálogo de todos los tipos de entidades de agua disponibles.
 
@@ -247,16 +252,16 @@ async def get_tipos_disponibles(db: Session = Depends(get_db)):
         ]
 
     Note:
-        La lista se genera dinámicamente basándose en los datos existentes,
-        por lo que puede variar según el contenido de la base de datos.
+        La lista se genera dinámicamente basándose en los datos existentes
+        (catálogo en memoria, se actualiza con cada refresco).
     """
-    tipos = db.query(EntidadAgua.tipo).distinct().order_by(EntidadAgua.tipo).all()
-    return [tipo[0] for tipo in tipos]
+    catalogos = obtener_catalogos() or await refrescar_catalogos(db)
+    return list(catalogos.tipos_entidad)
 
 @router.get("/metricas/{nombre_estacion}", response_model=List[str])
 async def get_metricas_by_estacion(
     nombre_estacion: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Obtener las métricas (tipos) asociadas a una estación específica por su nombre.
@@ -283,10 +288,9 @@ async def get_metricas_by_estacion(
             "temperatura"
         ]
     """
-    # Buscar todas las entidades con ese nombre
-    metricas = db.query(EntidadAgua.tipo).filter(
-        EntidadAgua.nombre == nombre_estacion
-    ).distinct().order_by(EntidadAgua.tipo).all()
+    # Tipos de todas las entidades con ese nombre, desde el catálogo en memoria
+    catalogos = obtener_catalogos() or await refrescar_catalogos(db)
+    metricas = catalogos.tipos_entidad_nombre(nombre_estacion)
 
     if not metricas:
         raise HTTPException(
@@ -294,13 +298,16 @@ async def get_metricas_by_estacion(
             detail=f"No se encontraron métricas para la estación '{nombre_estacion}'"
         )
 
-    return [metrica[0] for metrica in metricas]
+    return list(metricas)
 
 @router.get("/datos/{nombre_estacion}/{tipo}")
 async def get_datos_estacion_por_tipo(
     nombre_estacion: str,
     tipo: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    max_points: Optional[int] = Query(
+        None, ge=3, description="Cantidad máxima de puntos por serie (submuestreo LTTB)"
+    )
 ):
     """
     Obtener los datos de una estación específica desde la vista asociada al tipo (métrica).
@@ -311,6 +318,7 @@ async def get_datos_estacion_por_tipo(
     Args:
         nombre_estacion (str): Nombre de la estación de agua
         tipo (str): Tipo de métrica/vista a consultar (debe ser exactamente como aparece en la base de datos)
+        max_points (int, opcional): Máximo de puntos por serie; se submuestrea con LTTB
 
     Tipos disponibles:
         - Cuenca Hidrográfica: Datos anuales de glaciares por cuenca
@@ -357,16 +365,17 @@ async def get_datos_estacion_por_tipo(
     # Obtener configuración del tipo
     config = TIPO_VISTA_MAPPING[tipo]
     model = config["model"]
-    schema = config["schema"]
     estacion_column = config["estacion_column"]
 
     # Obtener el atributo de columna del modelo
     estacion_attr = getattr(model, estacion_column)
 
-    # Consultar la vista correspondiente
-    datos = db.query(model).filter(
+    # Consultar la vista correspondiente, en orden cronológico, como tuplas
+    columnas = columnas_vista(model)
+    result = await db.execute(select(*columnas).where(
         estacion_attr == nombre_estacion
-    ).all()
+    ).order_by(clave_periodo(model)))
+    datos = result.all()
 
     if not datos:
         raise HTTPException(
@@ -374,14 +383,17 @@ async def get_datos_estacion_por_tipo(
             detail=f"No se encontraron datos para la estación '{nombre_estacion}' en la vista de tipo '{tipo}'"
         )
 
-    # Convertir a schema para retornar con el formato correcto
-    return [schema.from_orm(dato) for dato in datos]
+    nombres = [columna.name for columna in columnas]
+    datos = reducir_filas(model, nombres, datos, max_points)
+
+    # Los campos del schema coinciden con las columnas del modelo: se serializa directo
+    return respuesta_json(nombres, datos)
 
 @router.get("/submetricas/{tipo}/{nombre_estacion}")
 async def get_submetricas_by_tipo_estacion(
     tipo: str,
     nombre_estacion: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Obtener las submétricas (nombres de gráficos) disponibles para una estación según su tipo.
@@ -450,9 +462,9 @@ async def get_submetricas_by_tipo_estacion(
         estacion_attr = getattr(model, estacion_column)
 
         # Consultar valores únicos de parametros_poal para esta estación
-        parametros = db.query(model.parametros_poal).filter(
+        parametros = (await db.execute(select(model.parametros_poal).where(
             estacion_attr == nombre_estacion
-        ).distinct().all()
+        ).distinct())).all()
 
         if not parametros:
             raise HTTPException(
@@ -473,9 +485,9 @@ async def get_submetricas_by_tipo_estacion(
         estacion_column = config["estacion_column"]
         estacion_attr = getattr(model, estacion_column)
 
-        existe = db.query(model).filter(
+        existe = await db.scalar(select(model).where(
             estacion_attr == nombre_estacion
-        ).first()
+        ).limit(1))
 
         if not existe:
             raise HTTPException(
@@ -495,3 +507,72 @@ async def get_submetricas_by_tipo_estacion(
         "estacion": nombre_estacion,
         "submetricas": submetricas
     }
+
+@router.get("/remuestreo/{nombre_estacion}/{tipo}", response_model=RemuestreoSchema)
+async def get_remuestreo_por_tipo(
+    nombre_estacion: str,
+    tipo: str,
+    db: AsyncSession = Depends(get_async_db),
+    frecuencia: Frecuencia = Query(..., description="trimestre, temporada (verano DEF...), anio_hidrologico (abril-marzo) o anio"),
+    reductor: Reductor = Query("mean", description="Agregación de los registros de cada periodo")
+):
+    """
+    Agregar la serie de una estación de agua a trimestres, temporadas, años hidrológicos o años.
+
+    Por ejemplo, el total anual de precipitación de una estación meteorológica:
+        GET /entidades-agua/remuestreo/Quinta%20Normal/Estación%20Meteorológica?frecuencia=anio&reductor=sum
+
+    Solo aplica a los tipos cuya vista tiene una columna "value". Si la vista mezcla varias
+    series (por ejemplo un metal por parámetro POAL), cada una se agrega por separado.
+    Si la estación no tiene registros en la vista del tipo se responde 404, como en /datos.
+    """
+    if tipo not in TIPO_VISTA_MAPPING:
+        tipos_disponibles = ", ".join(TIPO_VISTA_MAPPING.keys())
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tipo '{tipo}' no válido. Tipos disponibles: {tipos_disponibles}"
+        )
+
+    config = TIPO_VISTA_MAPPING[tipo]
+    model = config["model"]
+    if not hasattr(model, "value"):
+        raise HTTPException(
+            status_code=400,
+            detail=f"El tipo '{tipo}' tiene varias columnas de valor y no admite remuestreo"
+        )
+
+    estacion_column = config["estacion_column"]
+    estacion_attr = getattr(model, estacion_column)
+
+    # Columnas de la clave que separan series dentro de la vista (ni periodo ni estación)
+    mapper = inspect(model)
+    series = [
+        columna for columna in mapper.primary_key[1:]
+        if mapper.get_property_by_column(columna).key != estacion_column
+    ]
+
+    try:
+        consulta = consulta_remuestreo(
+            model, model.value, [estacion_attr == nombre_estacion], frecuencia, reductor, series
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+    filas = (await db.execute(consulta)).all()
+
+    if not filas:
+        existe = (await db.execute(
+            select(literal(1)).select_from(model).where(estacion_attr == nombre_estacion).limit(1)
+        )).first()
+        if existe is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No se encontraron datos para la estación '{nombre_estacion}' en la vista de tipo '{tipo}'"
+            )
+
+    return {
+        "nombre": nombre_estacion,
+        "submetrica": tipo,
+        "frecuencia": frecuencia,
+        "reductor": reductor,
+        "datos": puntos_remuestreo(filas, frecuencia, len(series))
+    }
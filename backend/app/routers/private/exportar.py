@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import List
+
+from core.exportacion import (
+    VISTAS_EXPORTABLES, MEDIA_ARROW, MEDIA_PARQUET,
+    requerir_pyarrow, esquema_arrow, arrow_ipc, parquet
+)
+from core.vistas import FiltrosVista, consulta_exportacion
+
+router = APIRouter(
+    prefix="/exportar",
+    tags=["Exportación"],
+    responses={404: {"description": "No encontrado"}}
+)
+
+
+def _modelo(vista: str) -> type:
+    modelo = VISTAS_EXPORTABLES.get(vista)
+    if modelo is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Vista '{vista}' no encontrada. Consulte /exportar/vistas"
+        )
+    return modelo
+
+
+@router.get("/vistas", response_model=List[str])
+async def get_vistas_exportables():
+    """Nombres de las vistas de aire y agua que se pueden exportar"""
+    return list(VISTAS_EXPORTABLES)
+
+
+@router.get(
+    "/{vista}/arrow",
+    response_class=StreamingResponse,
+    responses={200: {"content": {MEDIA_ARROW: {}}}},
+    summary="Exportar vista como Arrow IPC",
+)
+async def exportar_arrow(vista: str, filtros: FiltrosVista = Depends()):
+    """
+    Exporta la vista como stream Arrow IPC (un record batch por lote leído).
+
+    Acepta los mismos filtros que los endpoints JSON (estacion, numero_region, desde, hasta).
+    Se lee con pyarrow.ipc.open_stream o pandas/polars directamente.
+    """
+    requerir_pyarrow()
+    modelo = _modelo(vista)
+    return StreamingResponse(
+        arrow_ipc(consulta_exportacion(modelo, filtros), esquema_arrow(modelo)),
+        media_type=MEDIA_ARROW,
+        headers={"Content-Disposition": f'attachment; filename="{vista}.arrows"'}
+    )
+
+
+@router.get(
+    "/{vista}/parquet",
+    response_class=StreamingResponse,
+    responses={200: {"content": {MEDIA_PARQUET: {}}}},
+    summary="Exportar vista como Parquet",
+)
+async def exportar_parquet(vista: str, filtros: FiltrosVista = Depends()):
+    """
+    Exporta la vista como archivo Parquet (un row group por lote leído).
+
+    Acepta los mismos filtros que los endpoints JSON (estacion, numero_region, desde, hasta).
+    """
+    requerir_pyarrow()
+    modelo = _modelo(vista)
+    return StreamingResponse(
+        parquet(consulta_exportacion(modelo, filtros), esquema_arrow(modelo)),
+        media_type=MEDIA_PARQUET,
+        headers={"Content-Disposition": f'attachment; filename="{vista}.parquet"'}
+    )
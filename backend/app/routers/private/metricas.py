@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, exists, or_
 from typing import List
 
-from core.dependencies import get_db
+from core.dependencies import get_async_db
+from core.disponibilidad import obtener_indice
+from core.periodos import clave_periodo
+from core.submetricas import VISTAS_POR_FAMILIA
 from models.aire import (
     VTemperatura, VHumedadRadiacionUV, VNumEventosDeOlasDeCalor,
     VMp25Anual, VMp25Mensual, VMp10Anual, VMp10Mensual,
@@ -20,85 +24,57 @@ router = APIRouter(
     responses={404: {"description": "No encontrado"}}
 )
 
+# Tabs del frontend y familias de métricas (del registro de submétricas) que las habilitan
+TABS_FAMILIAS = [
+    ("temperatura", {"temperatura"}),
+    ("mp25", {"mp25"}),
+    ("mp10", {"mp10"}),
+    ("o3", {"o3"}),
+    ("so2", {"so2"}),
+    ("no2", {"no2"}),
+    ("co", {"co"}),
+    ("humedad_radiacion_uv", {"humedad_radiacion_uv", "olas_calor"}),
+]
+
+def _consulta_tabs(nombre_estacion: str):
+    """
+    Una sola sentencia con una columna booleana por tab.
+
+    Cada tab es un OR de sondas EXISTS sobre las vistas de sus familias, que se detienen
+    en la primera fila encontrada en vez de contar todos los registros de la estación.
+    """
+    return select(*[
+        or_(*[
+            exists().where(modelo.estacion == nombre_estacion)
+            for familia in familias_tab
+            for modelo in VISTAS_POR_FAMILIA[familia]
+        ]).label(tab)
+        for tab, familias_tab in TABS_FAMILIAS
+    ])
+
 @router.get("/tabs/{nombre_estacion}")
-async def get_metricas_disponibles(nombre_estacion: str, db: Session = Depends(get_db)):
+async def get_metricas_disponibles(
+    nombre_estacion: str,
+    db: AsyncSession = Depends(get_async_db),
+    usar_indice: bool = Query(True, description="Responder desde el índice de disponibilidad en memoria si está disponible")
+):
     """
     Obtener las métricas disponibles para una estación específica.
     Retorna un array de strings con las métricas que tienen datos.
 
-    Posibles valores: 'temperatura', 'mp25', 'mp10', 'o3', 'so2', 'no2', 'co', 'otros'
+    Posibles valores: 'temperatura', 'mp25', 'mp10', 'o3', 'so2', 'no2', 'co', 'humedad_radiacion_uv'
     """
-    metricas_disponibles = []
-
-    # Verificar Temperatura
-    temp_count = db.query(VTemperatura).filter(
-        VTemperatura.estacion == nombre_estacion
-    ).count()
-    if temp_count > 0:
-        metricas_disponibles.append('temperatura')
-
-    # Verificar MP2.5
-    mp25_count = db.query(VMp25Anual).filter(
-        VMp25Anual.estacion == nombre_estacion
-    ).count() + db.query(VMp25Mensual).filter(
-        VMp25Mensual.estacion == nombre_estacion
-    ).count()
-    if mp25_count > 0:
-        metricas_disponibles.append('mp25')
-
-    # Verificar MP10
-    mp10_count = db.query(VMp10Anual).filter(
-        VMp10Anual.estacion == nombre_estacion
-    ).count() + db.query(VMp10Mensual).filter(
-        VMp10Mensual.estacion == nombre_estacion
-    ).count()
-    if mp10_count > 0:
-        metricas_disponibles.append('mp10')
-
-    # Verificar O3
-    o3_count = db.query(VO3Anual).filter(
-        VO3Anual.estacion == nombre_estacion
-    ).count() + db.query(VO3Mensual).filter(
-        VO3Mensual.estacion == nombre_estacion
-    ).count()
-    if o3_count > 0:
-        metricas_disponibles.append('o3')
-
-    # Verificar SO2
-    so2_count = db.query(VSo2Anual).filter(
-        VSo2Anual.estacion == nombre_estacion
-    ).count() + db.query(VSo2Mensual).filter(
-        VSo2Mensual.estacion == nombre_estacion
-    ).count()
-    if so2_count > 0:
-        metricas_disponibles.append('so2')
-
-    # Verificar NO2
-    no2_count = db.query(VNo2Anual).filter(
-        VNo2Anual.estacion == nombre_estacion
-    ).count() + db.query(VNo2Mensual).filter(
-        VNo2Mensual.estacion == nombre_estacion
-    ).count()
-    if no2_count > 0:
-        metricas_disponibles.append('no2')
-
-    # Verificar CO
-    co_count = db.query(VCoAnual).filter(
-        VCoAnual.estacion == nombre_estacion
-    ).count() + db.query(VCoMensual).filter(
-        VCoMensual.estacion == nombre_estacion
-    ).count()
-    if co_count > 0:
-        metricas_disponibles.append('co')
-
-    # Verificar Humedad, Radiación UV y Olas de Calor
-    humedad_rad_uv_count = db.query(VHumedadRadiacionUV).filter(
-        VHumedadRadiacionUV.estacion == nombre_estacion
-    ).count() + db.query(VNumEventosDeOlasDeCalor).filter(
-        VNumEventosDeOlasDeCalor.estacion == nombre_estacion
-    ).count()
-    if humedad_rad_uv_count > 0:
-        metricas_disponibles.append('humedad_radiacion_uv')
+    indice = obtener_indice() if usar_indice else None
+    if indice is not None:
+        familias = indice.estacion(nombre_estacion).familias
+        metricas_disponibles = [
+            tab for tab, familias_tab in TABS_FAMILIAS if familias & familias_tab
+        ]
+    else:
+        fila = (await db.execute(_consulta_tabs(nombre_estacion))).one()
+        metricas_disponibles = [
+            tab for (tab, _), disponible in zip(TABS_FAMILIAS, fila) if disponible
+        ]
 
     return {
         "estacion": nombre_estacion,
@@ -106,11 +82,11 @@ async def get_metricas_disponibles(nombre_estacion: str, db: Session = Depends(g
     }
 
 @router.get("/temperatura/{nombre_estacion}", response_model=List[TemperaturaData])
-async def get_temperatura(nombre_estacion: str, db: Session = Depends(get_db)):
+async def get_temperatura(nombre_estacion: str, db: AsyncSession = Depends(get_async_db)):
     """Obtener datos de temperatura para una estación específica"""
-    datos = db.query(VTemperatura).filter(
+    datos = (await db.execute(select(VTemperatura).where(
         VTemperatura.estacion == nombre_estacion
-    ).order_by(VTemperatura.mes).all()
+    ).order_by(clave_periodo(VTemperatura)))).scalars().all()
 
     if not datos:
         return []
@@ -118,15 +94,15 @@ async def get_temperatura(nombre_estacion: str, db: Session = Depends(get_db)):
     return datos
 
 @router.get("/mp25/{nombre_estacion}")
-async def get_mp25(nombre_estacion: str, db: Session = Depends(get_db)):
+async def get_mp25(nombre_estacion: str, db: AsyncSession = Depends(get_async_db)):
     """Obtener datos de MP2.5 (anuales y mensuales) para una estación"""
-    anuales = db.query(VMp25Anual).filter(
+    anuales = (await db.execute(select(VMp25Anual).where(
         VMp25Anual.estacion == nombre_estacion
-    ).order_by(VMp25Anual.anio).all()
+    ).order_by(VMp25Anual.anio))).scalars().all()
 
-    mensuales = db.query(VMp25Mensual).filter(
+    mensuales = (await db.execute(select(VMp25Mensual).where(
         VMp25Mensual.estacion == nombre_estacion
-    ).order_by(VMp25Mensual.mes).all()
+    ).order_by(clave_periodo(VMp25Mensual)))).scalars().all()
 
     # Convertir a formato común
     datos_anuales = [{
@@ -156,15 +132,15 @@ async def get_mp25(nombre_estacion: str, db: Session = Depends(get_db)):
     }
 
 @router.get("/mp10/{nombre_estacion}")
-async def get_mp10(nombre_estacion: str, db: Session = Depends(get_db)):
+async def get_mp10(nombre_estacion: str, db: AsyncSession = Depends(get_async_db)):
     """Obtener datos de MP10 (anuales y mensuales) para una estación"""
-    anuales = db.query(VMp10Anual).filter(
+    anuales = (await db.execute(select(VMp10Anual).where(
         VMp10Anual.estacion == nombre_estacion
-    ).order_by(VMp10Anual.anio).all()
+    ).order_by(VMp10Anual.anio))).scalars().all()
 
-    mensuales = db.query(VMp10Mensual).filter(
+    mensuales = (await db.execute(select(VMp10Mensual).where(
         VMp10Mensual.estacion == nombre_estacion
-    ).order_by(VMp10Mensual.mes).all()
+    ).order_by(clave_periodo(VMp10Mensual)))).scalars().all()
 
     datos_anuales = [{
         "anio": d.anio,
@@ -193,15 +169,15 @@ async def get_mp10(nombre_estacion: str, db: Session = Depends(get_db)):
     }
 
 @router.get("/o3/{nombre_estacion}")
-async def get_o3(nombre_estacion: str, db: Session = Depends(get_db)):
+async def get_o3(nombre_estacion: str, db: AsyncSession = Depends(get_async_db)):
     """Obtener datos de Ozono (anuales y mensuales) para una estación"""
-    anuales = db.query(VO3Anual).filter(
+    anuales = (await db.execute(select(VO3Anual).where(
         VO3Anual.estacion == nombre_estacion
-    ).order_by(VO3Anual.anio).all()
+    ).order_by(VO3Anual.anio))).scalars().all()
 
-    mensuales = db.query(VO3Mensual).filter(
+    mensuales = (await db.execute(select(VO3Mensual).where(
         VO3Mensual.estacion == nombre_estacion
-    ).order_by(VO3Mensual.mes).all()
+    ).order_by(clave_periodo(VO3Mensual)))).scalars().all()
 
     datos_anuales = [{
         "anio": d.anio,
@@ -230,15 +206,15 @@ async def get_o3(nombre_estacion: str, db: Session = Depends(get_db)):
     }
 
 @router.get("/so2/{nombre_estacion}")
-async def get_so2(nombre_estacion: str, db: Session = Depends(get_db)):
+async def get_so2(nombre_estacion: str, db: AsyncSession = Depends(get_async_db)):
     """Obtener datos de SO2 (anuales y mensuales) para una estación"""
-    anuales = db.query(VSo2Anual).filter(
+    anuales = (await db.execute(select(VSo2Anual).where(
         VSo2Anual.estacion == nombre_estacion
-    ).order_by(VSo2Anual.anio).all()
+    ).order_by(VSo2Anual.anio))).scalars().all()
 
-    mensuales = db.query(VSo2Mensual).filter(
+    mensuales = (await db.execute(select(VSo2Mensual).where(
         VSo2Mensual.estacion == nombre_estacion
-    ).order_by(VSo2Mensual.mes).all()
+    ).order_by(clave_periodo(VSo2Mensual)))).scalars().all()
 
     datos_anuales = [{
         "anio": d.anio,
@@ -267,15 +243,15 @@ async def get_so2(nombre_estacion: str, db: Session = Depends(get_db)):
     }
 
 @router.get("/no2/{nombre_estacion}")
-async def get_no2(nombre_estacion: str, db: Session = Depends(get_db)):
+async def get_no2(nombre_estacion: str, db: AsyncSession = Depends(get_async_db)):
     """Obtener datos de NO2 (anuales y mensuales) para una estación"""
-    anuales = db.query(VNo2Anual).filter(
+    anuales = (await db.execute(select(VNo2Anual).where(
         VNo2Anual.estacion == nombre_estacion
-    ).order_by(VNo2Anual.anio).all()
+    ).order_by(VNo2Anual.anio))).scalars().all()
 
-    mensuales = db.query(VNo2Mensual).filter(
+    mensuales = (await db.execute(select(VNo2Mensual).where(
         VNo2Mensual.estacion == nombre_estacion
-    ).order_by(VNo2Mensual.mes).all()
+    ).order_by(clave_periodo(VNo2Mensual)))).scalars().all()
 
     datos_anuales = [{
         "anio": d.anio,
@@ -304,15 +280,15 @@ async def get_no2(nombre_estacion: str, db: Session = Depends(get_db)):
     }
 
 @router.get("/co/{nombre_estacion}")
-async def get_co(nombre_estacion: str, db: Session = Depends(get_db)):
+async def get_co(nombre_estacion: str, db: AsyncSession = Depends(get_async_db)):
     """Obtener datos de CO (anuales y mensuales) para una estación"""
-    anuales = db.query(VCoAnual).filter(
+    anuales = (await db.execute(select(VCoAnual).where(
         VCoAnual.estacion == nombre_estacion
-    ).order_by(VCoAnual.anio).all()
+    ).order_by(VCoAnual.anio))).scalars().all()
 
-    mensuales = db.query(VCoMensual).filter(
+    mensuales = (await db.execute(select(VCoMensual).where(
         VCoMensual.estacion == nombre_estacion
-    ).order_by(VCoMensual.mes).all()
+    ).order_by(clave_periodo(VCoMensual)))).scalars().all()
 
     datos_anuales = [{
         "anio": d.anio,
@@ -341,15 +317,15 @@ async def get_co(nombre_estacion: str, db: Session = Depends(get_db)):
     }
 
 @router.get("/humedad_radiacion_uv/{nombre_estacion}")
-async def get_humedad_radiacion_uv(nombre_estacion: str, db: Session = Depends(get_db)):
+async def get_humedad_radiacion_uv(nombre_estacion: str, db: AsyncSession = Depends(get_async_db)):
     """Obtener datos de Humedad, Radiación UV y Olas de Calor para una estación"""
-    humedad_rad_uv = db.query(VHumedadRadiacionUV).filter(
+    humedad_rad_uv = (await db.execute(select(VHumedadRadiacionUV).where(
         VHumedadRadiacionUV.estacion == nombre_estacion
-    ).order_by(VHumedadRadiacionUV.mes).all()
+    ).order_by(clave_periodo(VHumedadRadiacionUV)))).scalars().all()
 
-    olas_calor = db.query(VNumEventosDeOlasDeCalor).filter(
+    olas_calor = (await db.execute(select(VNumEventosDeOlasDeCalor).where(
         VNumEventosDeOlasDeCalor.estacion == nombre_estacion
-    ).order_by(VNumEventosDeOlasDeCalor.mes).all()
+    ).order_by(clave_periodo(VNumEventosDeOlasDeCalor)))).scalars().all()
 
     return {
         "estacion": nombre_estacion,
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
 from datetime import datetime
 
-from core.dependencies import get_db
+from core.cache import cache_respuestas
+from core.dependencies import get_async_db
 from core.config import settings
-from schemas.common import HealthResponse, InfoResponse
+from schemas.common import HealthResponse, InfoResponse, CacheStatsResponse
 
 router = APIRouter(
     prefix="",
@@ -12,11 +14,11 @@ router = APIRouter(
 )
 
 @router.get("/health", response_model=HealthResponse)
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_async_db)):
     """Health check básico de la API"""
     try:
         # Verificar conexión a la base de datos
-        result = db.execute("SELECT 1").scalar()
+        result = await db.scalar(text("SELECT 1"))
         db_status = "connected" if result == 1 else "disconnected"
     except Exception:
         db_status = "disconnected"
@@ -44,4 +46,9 @@ async def get_api_info():
             "email": settings.contact_email,
             "documentation": "/docs"
         }
-    }
\ No newline at end of file
+    }
+
+@router.get("/cache", response_model=CacheStatsResponse)
+async def get_cache_stats():
+    """Estadísticas del cache de respuestas de este proceso (para dimensionarlo)"""
+    return cache_respuestas.estadisticas()
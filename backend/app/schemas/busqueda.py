@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class SugerenciaSchema(BaseModel):
+    nombre: str = Field(..., description="Nombre de la estación o entidad de agua")
+    fuente: str = Field(..., description="'estacion' o 'entidad_agua'")
+    numero_region: Optional[int] = Field(None, description="Región de la estación")
+    nombre_region: Optional[str] = Field(None, description="Nombre de la región de la estación")
+    tipos: List[str] = Field(default_factory=list, description="Tipos de la entidad de agua")
+    coincidencia: str = Field(..., description="'prefijo' o 'similar' (por trigramas)")
+    puntaje: float = Field(..., description="1 para prefijos; similitud de trigramas (0-1) en otro caso")
@@ -18,4 +18,16 @@ class InfoResponse(BaseModel):
     description: str
     modules: list[str]
     data_sources: list[str]
-    contact: dict
\ No newline at end of file
+    contact: dict
+
+class CacheStatsResponse(BaseModel):
+    entradas: int
+    bytes: int
+    memoria_maxima: int
+    ttl_segundos: int
+    aciertos: int
+    fallos: int
+    tasa_aciertos: float
+    desalojos: int
+    expiradas: int
+    omitidas: int
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 
 class EstacionBase(BaseModel):
@@ -18,6 +18,12 @@ class EstacionCreate(EstacionBase):
     """Schema para crear nuevas estaciones (si lo necesitas en el futuro)"""
     pass
 
+class EstacionCercanaSchema(EstacionBase):
+    distancia_km: float = Field(..., description="Distancia de gran círculo al punto consultado, en km")
+
+    class Config:
+        from_attributes = True
+
 class RegionSchema(BaseModel):
     numero_region: int = Field(..., description="Número de la región")
     nombre_region: str = Field(..., description="Nombre de la región")
@@ -53,6 +59,62 @@ class DatosSubmetricaSchema(BaseModel):
     class Config:
         from_attributes = True
 
+class DatosSubmetricaColumnasSchema(BaseModel):
+    nombre: str = Field(..., description="Nombre de la estación")
+    submetrica: str = Field(..., description="Nombre de la submétrica consultada")
+    periodo: List[str] = Field(..., description="Periodos de los registros, en orden")
+    valor: List[Optional[float]] = Field(..., description="Valores, alineados con periodo")
+
+class ParSubmetricaSchema(BaseModel):
+    nombre: str = Field(..., description="Nombre de la estación")
+    submetrica: str = Field(..., description="Nombre exacto de la submétrica")
+
+class LoteSubmetricasSchema(BaseModel):
+    pares: List[ParSubmetricaSchema] = Field(..., min_length=1, description="Pares (estación, submétrica) a consultar")
+    max_points: Optional[int] = Field(None, ge=3, description="Cantidad máxima de puntos por serie (submuestreo LTTB)")
+
+class ComparacionSchema(BaseModel):
+    submetrica: str = Field(..., description="Nombre de la submétrica comparada")
+    periodos: List[str] = Field(..., description="Eje común de periodos, en orden cronológico")
+    series: Dict[str, List[Optional[float]]] = Field(
+        ..., description="Valores por estación alineados con periodos (null si la estación no tiene dato)"
+    )
+
+class PuntoAgregadoRegionalSchema(BaseModel):
+    periodo: str = Field(..., description="Periodo (año o año-mes)")
+    media: float = Field(..., description="Promedio entre estaciones")
+    mediana: float = Field(..., description="Mediana entre estaciones")
+    minimo: float = Field(..., description="Menor valor entre estaciones")
+    maximo: float = Field(..., description="Mayor valor entre estaciones")
+    estaciones: int = Field(..., description="Estaciones con dato en el periodo")
+
+class AgregadoRegionalSchema(BaseModel):
+    numero_region: int = Field(..., description="Número de la región")
+    nombre_region: Optional[str] = Field(None, description="Nombre de la región")
+    submetrica: str = Field(..., description="Nombre de la submétrica")
+    periodicidad: str = Field(..., description="'mensual' o 'anual'")
+    puntos: List[PuntoAgregadoRegionalSchema] = Field(..., description="Estadísticos por periodo, en orden cronológico")
+
+class PuntoRemuestreoSchema(BaseModel):
+    periodo: str = Field(..., description="Periodo agregado (ej: '2020-T1', '2020-verano', '2020-2021', '2020')")
+    valor: Optional[float] = Field(None, description="Valor agregado con el reductor pedido")
+    registros: int = Field(..., description="Registros no nulos que aportan al periodo")
+    serie: Optional[str] = Field(None, description="Serie dentro de la vista, cuando mezcla varias")
+
+class RemuestreoSchema(BaseModel):
+    nombre: str = Field(..., description="Nombre de la estación")
+    submetrica: str = Field(..., description="Submétrica o tipo agregado")
+    frecuencia: str = Field(..., description="Frecuencia de agregación")
+    reductor: str = Field(..., description="Función de agregación")
+    datos: List[PuntoRemuestreoSchema] = Field(..., description="Serie agregada en orden cronológico")
+
+class SubmetricaCatalogoSchema(BaseModel):
+    nombre: str = Field(..., description="Nombre exacto de la submétrica")
+    categoria: str = Field(..., description="Categoría de métrica a la que pertenece")
+    familia: str = Field(..., description="Familia de la métrica (ej: temperatura, mp25, o3)")
+    vista: str = Field(..., description="Vista de la base de datos que contiene los datos")
+    periodicidad: str = Field(..., description="Periodicidad de los registros: mensual o anual")
+
 class MetricasDetalladasSchema(BaseModel):
     temperatura: bool = Field(default=False)
     humedad_radiacion_uv: bool = Field(default=False)
@@ -70,3 +132,23 @@ class EstacionConMetricasSchema(BaseModel):
 
     class Config:
         from_attributes = True
+
+class EstadisticaSerieSchema(BaseModel):
+    registros: int = Field(..., description="Cantidad de registros")
+    primer_periodo: Optional[str] = Field(None, description="Primer periodo con datos")
+    ultimo_periodo: Optional[str] = Field(None, description="Último periodo con datos")
+
+    class Config:
+        from_attributes = True
+
+class DisponibilidadEstacionSchema(BaseModel):
+    nombre: str = Field(..., description="Nombre de la estación")
+    metricas_disponibles: List[str] = Field(..., description="Lista de categorías de métricas disponibles")
+    familias: List[str] = Field(..., description="Familias de métricas con registros (ej: temperatura, mp25)")
+    vistas: Dict[str, EstadisticaSerieSchema] = Field(..., description="Registros y periodos por vista")
+    submetricas: Dict[str, EstadisticaSerieSchema] = Field(..., description="Registros no nulos y periodos por submétrica")
+    actualizado: datetime = Field(..., description="Fecha de construcción del índice")
+
+class RefrescoSchema(BaseModel):
+    actualizado: datetime = Field(..., description="Fecha de construcción del índice")
+    estaciones: int = Field(..., description="Cantidad de estaciones con datos en el índice")
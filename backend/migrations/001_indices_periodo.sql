@@ -0,0 +1,112 @@
+-- Índices de expresión sobre la clave numérica del periodo (yyyymm / yyyymmdd).
+--
+-- La API filtra y ordena por
+--   CASE WHEN <periodo> ~ '<patrón>' THEN CAST(substr(replace(<periodo>, '-', ''), 1, n) AS INTEGER) END
+-- (ver app/core/periodos.py: clave_periodo y PATRON_PERIODO). Las vistas v_* no admiten
+-- índices, por lo que se crea el índice en la tabla base de cada vista, sobre la misma
+-- expresión escrita con la columna (o expresión) de la tabla base.
+-- Las vistas anuales usan la columna entera "anio" directamente y no necesitan índice.
+--
+-- Cada vista se resuelve así:
+--   * Si tabla_base y expresion_base están indicadas, se usan tal cual. expresion_base es
+--     la definición de la columna de periodo en la tabla base: el nombre de la columna
+--     (entre comillas dobles si hace falta) o una expresión como to_char(fecha, 'YYYY-MM').
+--   * Si no, se resuelve con information_schema.view_column_usage, pero solo cuando la
+--     vista expone una columna de la tabla base con el mismo nombre y sin renombrarla ni
+--     calcularla (su definición no contiene "AS <columna>").
+--   * Si no se puede resolver, la migración falla indicando las vistas que deben
+--     completarse a mano en la lista de abajo. Nada se omite en silencio.
+--
+-- Es idempotente: se puede ejecutar nuevamente al agregar vistas.
+--   psql "$DATABASE_URL" -f migrations/001_indices_periodo.sql
+
+DO $$
+DECLARE
+    vista RECORD;
+    base RECORD;
+    patron TEXT;
+    encontradas INTEGER;
+    sin_resolver TEXT[] := '{}';
+BEGIN
+    FOR vista IN
+        SELECT * FROM (VALUES
+            -- (vista, columna de periodo en la vista, dígitos, tabla base, expresión base)
+            ('v_temperatura', 'mes', 6, NULL, NULL),
+            ('v_humedad_radiacion_uv', 'mes', 6, NULL, NULL),
+            ('v_mp25_mensual', 'mes', 6, NULL, NULL),
+            ('v_mp10_mensual', 'mes', 6, NULL, NULL),
+            ('v_o3_mensual', 'mes', 6, NULL, NULL),
+            ('v_so2_mensual', 'mes', 6, NULL, NULL),
+            ('v_no2_mensual', 'mes', 6, NULL, NULL),
+            ('v_co_mensual', 'mes', 6, NULL, NULL),
+            ('v_no_mensual', 'mes', 6, NULL, NULL),
+            ('v_nox_mensual', 'mes', 6, NULL, NULL),
+            ('v_num_eventos_de_olas_de_calor', 'mes', 6, NULL, NULL),
+            ('v_mar_mensual', 'mes', 6, NULL, NULL),
+            ('v_coliformes_fecales_en_matriz_biologica', 'Día', 8, NULL, NULL),
+            ('v_coliformes_fecales_en_matriz_acuosa', 'Día', 8, NULL, NULL),
+            ('v_metales_totales_en_la_matriz_sedimentaria', 'Día', 8, NULL, NULL),
+            ('v_metales_disueltos_en_la_matriz_acuosa', 'Día', 8, NULL, NULL),
+            ('v_caudal_medio_de_aguas_corrientes', 'Mes', 6, NULL, NULL),
+            ('v_cantidad_de_agua_caida', 'Mes', 6, NULL, NULL),
+            ('v_evaporacion_real_por_estacion', 'Mes', 6, NULL, NULL),
+            ('v_volumen_del_embalse_por_embalse', 'Mes', 6, NULL, NULL),
+            ('v_altura_nieve_equivalente_en_agua', 'Día', 8, NULL, NULL),
+            ('v_nivel_estatico_de_aguas_subterraneas', 'Día', 8, NULL, NULL)
+        ) AS v(nombre, columna, digitos, tabla_base, expresion_base)
+    LOOP
+        -- Debe coincidir con PATRON_PERIODO en app/core/periodos.py
+        patron := CASE vista.digitos
+            WHEN 6 THEN '^[0-9]{4}-?[0-9]{2}'
+            ELSE '^[0-9]{4}-?[0-9]{2}-?[0-9]{2}'
+        END;
+
+        IF vista.tabla_base IS NOT NULL THEN
+            EXECUTE format(
+                'CREATE INDEX IF NOT EXISTS %I ON %s ((CASE WHEN (%s ~ %L) THEN CAST(substr(replace(%s, ''-'', ''''), 1, %s) AS INTEGER) END))',
+                left('ix_' || replace(vista.tabla_base, '.', '_') || '_clave_periodo', 63),
+                vista.tabla_base, vista.expresion_base, patron, vista.expresion_base, vista.digitos
+            );
+            CONTINUE;
+        END IF;
+
+        -- view_column_usage informa columnas de la tabla base: el mismo nombre solo
+        -- identifica la columna de la vista si esta no la renombra ni la calcula
+        IF pg_get_viewdef(format('public.%I', vista.nombre)::regclass)
+           ~ format('\sAS\s+%s(,|\s|$)', quote_ident(vista.columna)) THEN
+            sin_resolver := sin_resolver || vista.nombre;
+            CONTINUE;
+        END IF;
+
+        encontradas := 0;
+        FOR base IN
+            SELECT DISTINCT u.table_schema, u.table_name
+            FROM information_schema.view_column_usage u
+            JOIN information_schema.tables t
+              ON t.table_schema = u.table_schema
+             AND t.table_name = u.table_name
+             AND t.table_type = 'BASE TABLE'
+            WHERE u.view_schema = 'public'
+              AND u.view_name = vista.nombre
+              AND u.column_name = vista.columna
+        LOOP
+            encontradas := encontradas + 1;
+            EXECUTE format(
+                'CREATE INDEX IF NOT EXISTS %I ON %I.%I ((CASE WHEN (%I ~ %L) THEN CAST(substr(replace(%I, ''-'', ''''), 1, %s) AS INTEGER) END))',
+                left('ix_' || base.table_name || '_clave_periodo', 63),
+                base.table_schema, base.table_name, vista.columna, patron, vista.columna, vista.digitos
+            );
+        END LOOP;
+
+        IF encontradas = 0 THEN
+            sin_resolver := sin_resolver || vista.nombre;
+        END IF;
+    END LOOP;
+
+    IF cardinality(sin_resolver) > 0 THEN
+        RAISE EXCEPTION 'No se pudo resolver la columna de periodo en la tabla base de: %',
+            array_to_string(sin_resolver, ', ')
+            USING HINT = 'Indique tabla_base y expresion_base para esas vistas en migrations/001_indices_periodo.sql';
+    END IF;
+END
+$$;
@@ -0,0 +1,34 @@
+import importlib
+import os
+import sys
+import tempfile
+
+# La configuración se lee al importar core.config: las pruebas usan SQLite en un
+# directorio temporal en lugar de la base de datos real
+_DIRECTORIO = tempfile.mkdtemp(prefix="observatorio-pruebas-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DIRECTORIO}/main.db")
+os.environ.setdefault("ASYNC_DATABASE_URL", f"sqlite+aiosqlite:///{_DIRECTORIO}/main.db")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+
+@pytest.fixture
+def sesion(tmp_path):
+    """Sesión sincrónica sobre SQLite con el esquema public adjunto y las vistas creadas como tablas"""
+    from core.database import Base
+    importlib.import_module("models")  # registra todas las vistas en Base.metadata
+
+    engine = create_engine(f"sqlite:///{tmp_path}/main.db")
+
+    @event.listens_for(engine, "connect")
+    def _adjuntar_public(conexion, _registro):
+        conexion.execute(f"ATTACH DATABASE '{tmp_path}/public.db' AS public")
+
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        yield db
+    engine.dispose()
@@ -0,0 +1,67 @@
+from datetime import datetime
+
+import pytest
+
+from core.busqueda import (
+    FUENTE_ENTIDAD_AGUA, FUENTE_ESTACION, Documento, IndiceBusqueda, normalizar, trigramas
+)
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("Ñuñoa", "nunoa"),
+    ("  Quinta   Normal ", "quinta normal"),
+    ("Río Maipo (En El Manzano)", "rio maipo en el manzano"),
+    ("PARQUE O'HIGGINS", "parque o higgins"),
+    ("Estación Meteorológica", "estacion meteorologica"),
+    ("---", ""),
+])
+def test_normalizar(texto, esperado):
+    assert normalizar(texto) == esperado
+
+
+def test_trigramas_con_relleno_de_pg_trgm():
+    assert trigramas("sol") == {"  s", " so", "sol", "ol "}
+    assert trigramas("") == frozenset()
+
+
+def _documento(nombre: str, fuente: str = FUENTE_ESTACION) -> Documento:
+    return Documento(nombre, fuente, None, None, (), normalizar(nombre))
+
+
+@pytest.fixture
+def indice():
+    nombres = ["Ñuñoa", "Quinta Normal", "San Miguel", "Santiago Centro", "Parque O'Higgins", "Talagante"]
+    documentos = [_documento(nombre) for nombre in nombres]
+    documentos.append(_documento("Río San José", FUENTE_ENTIDAD_AGUA))
+    return IndiceBusqueda(documentos, datetime.now())
+
+
+def _nombres(resultados):
+    return [documento.nombre for documento, _, _ in resultados]
+
+
+def test_prefijo_sin_tildes_ni_mayusculas(indice):
+    assert _nombres(indice.buscar("NUNO", 10)) == ["Ñuñoa"]
+
+
+def test_prefijo_de_nombre_antes_que_de_palabra_interior(indice):
+    resultados = indice.buscar("san", 10)
+    nombres = _nombres(resultados)
+    assert nombres[:2] == ["San Miguel", "Santiago Centro"]
+    assert "Río San José" in nombres
+    assert all(coincidencia == "prefijo" for _, coincidencia, _ in resultados[:3])
+
+
+def test_limite_y_fuente(indice):
+    assert len(indice.buscar("san", 1)) == 1
+    assert _nombres(indice.buscar("san", 10, fuente=FUENTE_ENTIDAD_AGUA)) == ["Río San José"]
+
+
+def test_similares_toleran_errores_de_tipeo(indice):
+    documento, coincidencia, puntaje = indice.buscar("quinta nromal", 1)[0]
+    assert documento.nombre == "Quinta Normal"
+    assert coincidencia == "similar" and 0 < puntaje < 1
+
+
+def test_consulta_vacia(indice):
+    assert indice.buscar("  ¿? ", 10) == []
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from core import cache as modulo_cache
+from core.cache import CacheRespuestas, EntradaCache
+
+
+def _entrada(tamano: int) -> EntradaCache:
+    return EntradaCache(200, [], b"x" * tamano)
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    """Reloj monotónico controlado por la prueba"""
+    ahora = [1000.0]
+    monkeypatch.setattr(modulo_cache.time, "monotonic", lambda: ahora[0])
+    return ahora
+
+
+def test_desaloja_la_menos_usada():
+    cache = CacheRespuestas(ttl_segundos=60, memoria_maxima=300, entrada_maxima=300)
+    for clave in "abc":
+        cache.guardar(clave, _entrada(100))
+
+    # 'a' pasa a ser la más reciente: al entrar 'd' se desaloja 'b'
+    assert cache.obtener("a") is not None
+    cache.guardar("d", _entrada(100))
+
+    assert cache.obtener("b") is None
+    assert all(cache.obtener(clave) is not None for clave in "acd")
+    assert cache.estadisticas()["desalojos"] == 1
+
+
+def test_expira_por_ttl(reloj):
+    cache = CacheRespuestas(ttl_segundos=10, memoria_maxima=1000, entrada_maxima=1000)
+    cache.guardar("a", _entrada(10))
+
+    reloj[0] += 9.9
+    assert cache.obtener("a") is not None
+    reloj[0] += 0.2
+    assert cache.obtener("a") is None
+
+    estadisticas = cache.estadisticas()
+    assert estadisticas["expiradas"] == 1
+    assert estadisticas["entradas"] == 0
+    assert estadisticas["bytes"] == 0
+
+
+def test_contabiliza_bytes_y_omite_entradas_grandes():
+    cache = CacheRespuestas(ttl_segundos=60, memoria_maxima=500, entrada_maxima=200)
+    cache.guardar("a", EntradaCache(200, [(b"content-type", b"application/json")], b"x" * 50))
+    assert cache.estadisticas()["bytes"] == 50 + len(b"content-type") + len(b"application/json")
+
+    cache.guardar("grande", _entrada(201))
+    assert cache.obtener("grande") is None
+    assert cache.estadisticas()["omitidas"] == 1
+
+    # Reemplazar una clave no duplica sus bytes
+    cache.guardar("a", _entrada(100))
+    assert cache.estadisticas()["bytes"] == 100
+
+
+def test_variantes_comprimidas_cuentan_en_el_presupuesto():
+    cache = CacheRespuestas(ttl_segundos=60, memoria_maxima=3000, entrada_maxima=3000)
+    cache.guardar("vieja", _entrada(1000))
+    entrada = _entrada(1500)
+    cache.guardar("nueva", entrada)
+
+    comprimido = cache.variante("nueva", entrada, "gzip")
+    assert cache.variante("nueva", entrada, "gzip") is comprimido
+    assert cache.estadisticas()["bytes"] == 1000 + 1500 + len(comprimido)
+
+    # Sin espacio para la variante se desaloja la otra entrada, nunca la que se está usando
+    otra = EntradaCache(200, [], os.urandom(2500))  # incompresible
+    cache.vaciar()
+    cache.guardar("vieja", _entrada(400))
+    cache.guardar("nueva", otra)
+    cache.variante("nueva", otra, "gzip")
+    assert cache.obtener("vieja") is None
+    assert cache.obtener("nueva") is otra
@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from core.catalogos import EstacionCatalogo
+from core.espacial import IndiceEspacial, haversine_km
+
+
+@pytest.fixture(scope="module")
+def estaciones():
+    generador = np.random.default_rng(3)
+    latitudes = np.concatenate([generador.uniform(-56, -17, 300), generador.uniform(-90, 90, 200)])
+    longitudes = np.concatenate([generador.uniform(-76, -66, 300), generador.uniform(-180, 180, 200)])
+    # Casos de borde: antimeridiano y polos
+    latitudes = np.append(latitudes, [0.0, 0.0, 89.9, -89.9])
+    longitudes = np.append(longitudes, [179.95, -179.95, 10.0, -170.0])
+    return [
+        EstacionCatalogo(f"E{i}", float(latitud), float(longitud), None, None, None)
+        for i, (latitud, longitud) in enumerate(zip(latitudes, longitudes))
+    ]
+
+
+@pytest.fixture(scope="module", params=[1.0, 0.7, 7.0])
+def indice(request, estaciones):
+    return IndiceEspacial(estaciones, request.param, datetime.now())
+
+
+def _distancias(estaciones, latitud, longitud):
+    return haversine_km(
+        latitud, longitud,
+        np.array([e.latitud for e in estaciones]), np.array([e.longitud for e in estaciones])
+    )
+
+
+@pytest.mark.parametrize("area", [
+    (-40, -75, -30, -70),
+    (-10, 170, 10, -170),   # cruza el antimeridiano
+    (-90, -180, 90, 180),
+    (85, -180, 90, 180),
+])
+def test_en_area_igual_a_fuerza_bruta(indice, estaciones, area):
+    lat_min, lon_min, lat_max, lon_max = area
+    if lon_min <= lon_max:
+        dentro_lon = lambda lon: lon_min <= lon <= lon_max  # noqa: E731
+    else:
+        dentro_lon = lambda lon: lon >= lon_min or lon <= lon_max  # noqa: E731
+    esperadas = {
+        e.nombre for e in estaciones
+        if lat_min <= e.latitud <= lat_max and dentro_lon(e.longitud)
+    }
+    assert {e.nombre for e in indice.en_area(lat_min, lon_min, lat_max, lon_max)} == esperadas
+
+
+@pytest.mark.parametrize("punto, radio", [
+    ((-33.45, -70.66), 150),
+    ((0.0, 179.9), 50),      # el círculo cruza el antimeridiano
+    ((89.0, 0.0), 500),      # contiene el polo
+    ((-33.45, -70.66), 25000),
+])
+def test_en_radio_igual_a_fuerza_bruta(indice, estaciones, punto, radio):
+    distancias = _distancias(estaciones, *punto)
+    esperadas = {e.nombre for e, d in zip(estaciones, distancias) if d <= radio}
+
+    encontradas = indice.en_radio(*punto, radio)
+    assert {e.nombre for e, _ in encontradas} == esperadas
+    assert [d for _, d in encontradas] == sorted(d for _, d in encontradas)
+
+
+@pytest.mark.parametrize("punto", [(-33.45, -70.66), (0.0, -179.99), (-89.0, 45.0), (60.0, 100.0)])
+@pytest.mark.parametrize("cantidad", [1, 7, 50])
+def test_cercanas_igual_a_fuerza_bruta(indice, estaciones, punto, cantidad):
+    distancias = np.sort(_distancias(estaciones, *punto))[:cantidad]
+    encontradas = indice.cercanas(*punto, cantidad)
+    assert len(encontradas) == cantidad
+    assert np.allclose([d for _, d in encontradas], distancias)
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import core.version as modulo_version
+from core.version import VersionDatos
+from middleware.etag import add_etag_middleware
+
+URL = "/api/private/prueba"
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.state.llamadas = 0
+
+    @app.get(URL)
+    async def prueba():
+        app.state.llamadas += 1
+        return {"valor": 1}
+
+    add_etag_middleware(app)
+    return app
+
+
+@pytest.fixture
+def cliente(app, monkeypatch):
+    monkeypatch.setattr(modulo_version, "_version", VersionDatos("v1", datetime.now()))
+    return TestClient(app)
+
+
+def test_304_sin_ejecutar_el_endpoint(app, cliente):
+    respuesta = cliente.get(URL)
+    etag = respuesta.headers["etag"]
+    assert respuesta.status_code == 200
+    assert respuesta.headers["vary"] == "Accept, Accept-Encoding"
+
+    condicional = cliente.get(URL, headers={"If-None-Match": etag})
+    assert condicional.status_code == 304
+    assert condicional.content == b""
+    assert condicional.headers["etag"] == etag
+    assert condicional.headers["vary"] == respuesta.headers["vary"]
+    assert app.state.llamadas == 1
+
+    # Comparación débil y listas de candidatos
+    assert cliente.get(URL, headers={"If-None-Match": f'"otro", W/{etag}'}).status_code == 304
+    assert cliente.get(URL, headers={"If-None-Match": '"otro"'}).status_code == 200
+
+
+def test_etag_depende_de_la_variante_y_de_la_version(cliente, monkeypatch):
+    base = cliente.get(URL).headers["etag"]
+    assert cliente.get(URL, params={"a": "1"}).headers["etag"] != base
+    assert cliente.get(URL, headers={"Accept": "text/csv"}).headers["etag"] != base
+    assert cliente.get(URL, headers={"Accept-Encoding": "gzip"}).headers["etag"] != base
+
+    monkeypatch.setattr(modulo_version, "_version", VersionDatos("v2", datetime.now()))
+    nuevo = cliente.get(URL)
+    assert nuevo.headers["etag"] != base
+    assert cliente.get(URL, headers={"If-None-Match": base}).status_code == 200
+
+
+def test_sin_version_no_hay_etag(cliente, monkeypatch):
+    etag = cliente.get(URL).headers["etag"]
+    monkeypatch.setattr(modulo_version, "_version", None)
+
+    respuesta = cliente.get(URL, headers={"If-None-Match": etag})
+    assert respuesta.status_code == 200
+    assert "etag" not in respuesta.headers
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from core.muestreo import lttb, reducir_serie
+
+
+@pytest.fixture
+def serie():
+    generador = np.random.default_rng(7)
+    x = np.arange(1000, dtype=float)
+    y = np.cumsum(generador.normal(size=1000))
+    return x, y
+
+
+@pytest.mark.parametrize("umbral", [3, 10, 97, 500, 999])
+def test_lttb_invariantes(serie, umbral):
+    x, y = serie
+    elegidos = lttb(x, y, umbral)
+
+    assert len(elegidos) == umbral
+    assert elegidos[0] == 0 and elegidos[-1] == len(x) - 1
+    assert np.all(np.diff(elegidos) > 0)  # ordenados y sin repetidos
+
+    # Un punto por grupo: cada elegido interior cae en su propio tramo
+    bordes = np.linspace(1, len(x) - 1, umbral - 1).astype(np.intp)
+    for i, indice in enumerate(elegidos[1:-1]):
+        assert bordes[i] <= indice < bordes[i + 1]
+
+
+def test_lttb_conserva_picos():
+    x = np.arange(200, dtype=float)
+    y = np.zeros(200)
+    y[123] = 50.0
+    assert 123 in lttb(x, y, 20)
+
+
+@pytest.mark.parametrize("umbral", [0, 1, 2, 1000, 5000])
+def test_lttb_sin_reduccion(serie, umbral):
+    x, y = serie
+    assert np.array_equal(lttb(x, y, umbral), np.arange(len(x)))
+
+
+def test_reducir_serie_usa_el_eje_temporal():
+    periodos = [f"{anio}-{mes:02d}" for anio in range(2000, 2020) for mes in range(1, 13)]
+    valores = np.sin(np.arange(len(periodos)) / 5.0)
+
+    assert np.array_equal(reducir_serie(periodos, valores, None), np.arange(len(periodos)))
+    elegidos = reducir_serie(periodos, valores, 50)
+    assert len(elegidos) == 50 and elegidos[0] == 0 and elegidos[-1] == len(periodos) - 1
@@ -0,0 +1,27 @@
+import pytest
+
+from core.periodos import clave_de_texto
+
+
+@pytest.mark.parametrize("valor, digitos, final, clave", [
+    ("2020", 6, False, 202000),
+    ("2020", 6, True, 202099),
+    ("2020-03", 6, False, 202003),
+    ("2020-03", 8, False, 20200300),
+    ("2020-03", 8, True, 20200399),
+    ("2020-02-29", 8, False, 20200229),
+    ("2020-12-31", 8, True, 20201231),
+    ("2020", 4, True, 2020),
+    (" 2021-01 ", 6, False, 202101),
+])
+def test_clave_de_texto(valor, digitos, final, clave):
+    assert clave_de_texto(valor, digitos, final) == clave
+
+
+@pytest.mark.parametrize("valor", [
+    "2020-00", "2020-13", "2021-02-29", "2020-04-31", "2020-01-00",
+    "999", "10000", "2020-01-01-01", "2020/01", "", "enero",
+])
+def test_clave_de_texto_rechaza_fechas_imposibles(valor):
+    with pytest.raises(ValueError):
+        clave_de_texto(valor, 8)
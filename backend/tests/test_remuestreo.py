@@ -0,0 +1,97 @@
+from collections import defaultdict
+
+import pytest
+
+from core.remuestreo import consulta_remuestreo, etiqueta_periodo, puntos_remuestreo
+from models.aire import VMp25Anual, VTemperatura
+
+
+@pytest.mark.parametrize("frecuencia, anio, subperiodo, etiqueta", [
+    ("trimestre", 2020, 1, "2020-T1"),
+    ("temporada", 2021, 1, "2021-verano"),
+    ("temporada", 2020, 3, "2020-invierno"),
+    ("anio_hidrologico", 2019, None, "2019-2020"),
+    ("anio", 2020, None, "2020"),
+])
+def test_etiqueta_periodo(frecuencia, anio, subperiodo, etiqueta):
+    assert etiqueta_periodo(frecuencia, anio, subperiodo) == etiqueta
+
+
+def _grupo(frecuencia: str, anio: int, mes: int) -> str:
+    if frecuencia == "trimestre":
+        return f"{anio}-T{(mes + 2) // 3}"
+    if frecuencia == "temporada":
+        # Diciembre abre el verano del año siguiente
+        nombres = {1: "verano", 2: "otoño", 3: "invierno", 4: "primavera"}
+        return f"{anio + (mes == 12)}-{nombres[(mes % 12) // 3 + 1]}"
+    if frecuencia == "anio_hidrologico":
+        inicio = anio - (mes < 4)
+        return f"{inicio}-{inicio + 1}"
+    return str(anio)
+
+
+@pytest.fixture
+def temperaturas(sesion):
+    valores = {}
+    for anio in (2019, 2020):
+        for mes in range(1, 13):
+            valor = float(anio % 100 * 100 + mes)
+            valores[(anio, mes)] = valor
+            sesion.add(VTemperatura(mes=f"{anio}-{mes:02d}", estacion="Alfa", temp_med=valor))
+            sesion.add(VTemperatura(mes=f"{anio}-{mes:02d}", estacion="Beta", temp_med=-1.0))
+    # Un registro sin valor no cuenta
+    sesion.add(VTemperatura(mes="2018-12", estacion="Alfa", temp_med=None))
+    sesion.commit()
+    return valores
+
+
+@pytest.mark.parametrize("frecuencia", ["trimestre", "temporada", "anio_hidrologico", "anio"])
+def test_agrupa_igual_que_python(sesion, temperaturas, frecuencia):
+    esperados = defaultdict(list)
+    for (anio, mes), valor in temperaturas.items():
+        esperados[_grupo(frecuencia, anio, mes)].append(valor)
+
+    consulta = consulta_remuestreo(
+        VTemperatura, VTemperatura.temp_med, [VTemperatura.estacion == "Alfa"], frecuencia, "sum"
+    )
+    puntos = puntos_remuestreo(sesion.execute(consulta).all(), frecuencia)
+
+    assert {punto["periodo"]: punto["valor"] for punto in puntos} == {
+        periodo: sum(valores) for periodo, valores in esperados.items()
+    }
+    assert {punto["periodo"]: punto["registros"] for punto in puntos} == {
+        periodo: len(valores) for periodo, valores in esperados.items()
+    }
+
+
+def test_orden_cronologico(sesion, temperaturas):
+    consulta = consulta_remuestreo(
+        VTemperatura, VTemperatura.temp_med, [VTemperatura.estacion == "Alfa"], "temporada", "mean"
+    )
+    periodos = [punto["periodo"] for punto in puntos_remuestreo(sesion.execute(consulta).all(), "temporada")]
+    assert periodos == [
+        "2019-verano", "2019-otoño", "2019-invierno", "2019-primavera",
+        "2020-verano", "2020-otoño", "2020-invierno", "2020-primavera", "2021-verano",
+    ]
+
+
+def test_serie_anual_solo_admite_anio():
+    with pytest.raises(ValueError):
+        consulta_remuestreo(VMp25Anual, VMp25Anual.mp25_perc50, [], "trimestre", "mean")
+    consulta_remuestreo(VMp25Anual, VMp25Anual.mp25_perc50, [], "anio", "mean")
+
+
+def test_periodos_mal_formados_no_forman_grupo(sesion, temperaturas):
+    # Su clave es NULL: no deben aparecer como un grupo sin año (ni hacer fallar las etiquetas)
+    for mes in ("sin fecha", "2020/05", "20-05"):
+        sesion.add(VTemperatura(mes=mes, estacion="Alfa", temp_med=1000.0))
+    sesion.commit()
+
+    for frecuencia in ("trimestre", "temporada", "anio_hidrologico", "anio"):
+        consulta = consulta_remuestreo(
+            VTemperatura, VTemperatura.temp_med, [VTemperatura.estacion == "Alfa"], frecuencia, "count"
+        )
+        filas = sesion.execute(consulta).all()
+        assert all(fila[0] is not None for fila in filas)
+        puntos = puntos_remuestreo(filas, frecuencia)
+        assert sum(punto["registros"] for punto in puntos) == len(temperaturas)
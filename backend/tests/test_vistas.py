@@ -0,0 +1,67 @@
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from core.vistas import MEDIA_CSV, MEDIA_NDJSON, codificar_cursor, decodificar_cursor, formato_stream
+from models.agua import VCaudalMedioDeAguasCorrientes
+from models.aire import VMp25Anual
+
+
+def _cursor_crudo(valor) -> str:
+    return base64.urlsafe_b64encode(json.dumps(valor).encode()).decode().rstrip("=")
+
+
+def test_cursor_ida_y_vuelta():
+    valores = {"anio": 2020, "estacion": "Ñuñoa"}
+    cursor = codificar_cursor(valores)
+    assert "=" not in cursor
+    assert decodificar_cursor(cursor, VMp25Anual) == [2020, "Ñuñoa"]
+
+
+def test_cursor_devuelve_valores_en_orden_de_la_clave():
+    cursor = codificar_cursor({
+        "estaciones_fluviometricas": "Maipo", "mes": "2020-01", "aguas_corrientes": "Río Maipo"
+    })
+    assert decodificar_cursor(cursor, VCaudalMedioDeAguasCorrientes) == ["2020-01", "Río Maipo", "Maipo"]
+
+
+@pytest.mark.parametrize("cursor", [
+    "no es base64 !!",
+    base64.urlsafe_b64encode(b"{no json").decode(),
+    _cursor_crudo([2020, "Ñuñoa"]),
+    _cursor_crudo({"anio": 2020}),
+    _cursor_crudo({"anio": 2020, "estacion": "Ñuñoa", "otro": 1}),
+    _cursor_crudo({"anio": "2020", "estacion": "Ñuñoa"}),
+    _cursor_crudo({"anio": True, "estacion": "Ñuñoa"}),
+    _cursor_crudo({"anio": 2020, "estacion": None}),
+])
+def test_cursor_invalido_responde_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decodificar_cursor(cursor, VMp25Anual)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("accept, esperado", [
+    (None, None),
+    ("", None),
+    ("*/*", None),
+    ("application/json", None),
+    ("text/csv", MEDIA_CSV),
+    ("application/x-ndjson", MEDIA_NDJSON),
+    ("text/csv;q=0", None),
+    ("text/csv; q=0.0, application/json", None),
+    ("application/x-ndjson;q=0", None),
+    ("text/csv;q=0.5, application/json;q=0.9", None),
+    ("text/csv;q=0.9, application/json;q=0.5", MEDIA_CSV),
+    ("text/csv, application/json", None),
+    ("text/*", MEDIA_CSV),
+    ("text/*;q=0, */*", None),
+    ("text/html,application/xhtml+xml,*/*;q=0.8", None),
+    ("TEXT/CSV", MEDIA_CSV),
+    ("text/csv;q=abc", None),
+    ("text/csv;charset=utf-8", MEDIA_CSV),
+])
+def test_formato_stream_respeta_q(accept, esperado):
+    assert formato_stream(accept) == esperado